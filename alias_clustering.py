@@ -0,0 +1,264 @@
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from all_speakers import SpeakerRegistry
+
+# honorifics and titles that are dropped when building the normalised key
+TITLES = {
+    "mr", "mrs", "ms", "miss", "mister", "missus", "madam", "madame", "mme", "mlle",
+    "dr", "doctor", "prof", "professor", "sir", "lady", "lord", "dame", "master",
+    "captain", "capt", "colonel", "col", "general", "gen", "major", "lieutenant", "lt",
+    "sergeant", "sgt", "father", "mother", "brother", "sister", "aunt", "uncle",
+    "herr", "frau", "fräulein", "fraulein", "monsieur", "mademoiselle", "señor", "señora",
+    "signor", "signora", "don", "doña", "st", "saint", "king", "queen", "prince", "princess",
+}
+# titles that tell male and female speakers apart, "Mr. Bennet" and "Mrs. Bennet" are never merged
+MALE_TITLES = {
+    "mr", "mister", "sir", "lord", "master", "father", "brother", "uncle", "herr", "monsieur",
+    "señor", "signor", "don", "king", "prince",
+}
+FEMALE_TITLES = {
+    "mrs", "ms", "miss", "missus", "madam", "madame", "mme", "mlle", "lady", "dame", "mother",
+    "sister", "aunt", "frau", "fräulein", "fraulein", "mademoiselle", "señora", "signora", "doña",
+    "queen", "princess",
+}
+UNKNOWN = "unknown"
+
+
+class AliasClusterer:
+    """
+    Proposes speaker groups from the surface forms collected in a
+    SpeakerRegistry ("Mr. Darcy", "Darcy", "Fitzwilliam Darcy", ...).
+
+    1. names with the same normalised key (case, punctuation, titles removed)
+       and no conflicting title ("Mr." / "Mrs.") are merged directly
+    2. a token index links keys whose tokens are a subset of another key,
+       e.g. "darcy" -> "fitzwilliam darcy", if they share chunks or items;
+       ambiguous subsets are resolved by co-occurrence or left alone. A
+       titled short form only joins a name with a title of the same gender
+       ("Mr. Darcy" -> "Mr. Fitzwilliam Darcy", not "Mrs. Bennet" ->
+       "Elizabeth Bennet")
+    Before that, a character trigram index over the name tokens proposes
+    near-identical spellings ("Elisabeth" / "Elizabeth"), which are confirmed
+    by their edit similarity and folded into one canonical token.
+    """
+
+    def __init__(self, speaker_registry: SpeakerRegistry, similarity_threshold: float = 0.85):
+        self.speaker_registry = speaker_registry
+        self.similarity_threshold = similarity_threshold
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- public interface ------------------------- #
+    # --------------------------------------------------------------------- #
+    def cluster(self, include_singletons: bool = False) -> dict[str, list[str]]:
+        """
+        Returns {group_name: [alias, ...]} in the same shape as
+        SpeakerAliasUI.get_final_mapping(). The group name is the most
+        frequent alias of each cluster.
+        """
+        data = self.speaker_registry.to_dict()
+
+        # 1. normalised keys, spelling variants of a token share one canonical token
+        normalised = {name: self.normalise(name) for name in data}
+        canonical = self._canonical_tokens({t for key in normalised.values() for t in key})
+
+        # keys are (tokens, title gender), the gender is None for names without such a title
+        key_names: dict[tuple, list[str]] = defaultdict(list)
+        for name, tokens in normalised.items():
+            if tokens and tokens != (UNKNOWN,):
+                key_names[(tuple(canonical.get(t, t) for t in tokens), self.title_gender(name))].append(name)
+        keys = list(key_names)
+
+        key_chunks: dict[tuple, set[str]] = {}
+        key_count: dict[tuple, int] = {}
+        for key, names in key_names.items():
+            key_chunks[key] = {c for n in names for c in data[n]["chunks"]}
+            key_count[key] = sum(data[n]["count"] for n in names)
+
+        parent = {key: key for key in keys}
+        # title gender per cluster root
+        gender = {key: key[1] for key in keys}
+        # same tokens: a name without gendered title joins the only gendered variant,
+        # or the ungendered group if there is none
+        by_tokens: dict[tuple[str, ...], list[tuple]] = defaultdict(list)
+        for key in keys:
+            by_tokens[key[0]].append(key)
+        for variants in by_tokens.values():
+            plain = [key for key in variants if key[1] is None]
+            gendered = [key for key in variants if key[1] is not None]
+            if plain and len(gendered) == 1:
+                self._union(parent, gendered[0], plain[0], gender)
+
+        # 2. token subset links
+        token_index: dict[str, list[tuple]] = defaultdict(list)
+        for key in keys:
+            for token in set(key[0]):
+                token_index[token].append(key)
+
+        for key in keys:
+            tokens = key[0]
+            rarest = min((token_index[token] for token in tokens), key=len)
+            token_set = set(tokens)
+            supersets = [
+                other for other in rarest
+                if len(other[0]) > len(tokens) and token_set.issubset(other[0])
+                and self._compatible(gender, parent, key, other)
+            ]
+            target = self._pick_candidate(key, supersets, key_chunks, key_count)
+            if target is not None:
+                self._union(parent, target, key, gender)
+
+        # 3. collect clusters
+        clusters: dict[tuple, list[tuple]] = defaultdict(list)
+        for key in keys:
+            clusters[self._find(parent, key)].append(key)
+
+        groups: dict[str, list[str]] = {}
+        for members in clusters.values():
+            aliases = [name for key in members for name in key_names[key]]
+            if len(aliases) < 2 and not include_singletons:
+                continue
+            aliases.sort(key=lambda n: (-data[n]["count"], n))
+            groups[self._unique_group_name(aliases[0], groups)] = aliases
+        return groups
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- helpers ------------------------------- #
+    # --------------------------------------------------------------------- #
+    @staticmethod
+    def normalise(name: str) -> tuple[str, ...]:
+        """'Mr. Fitzwilliam  Darcy' -> ('fitzwilliam', 'darcy')"""
+        text = unicodedata.normalize("NFKC", name).casefold()
+        text = re.sub(r"[^\w\s'-]", " ", text)
+        tokens = [t.strip("'-") for t in text.split()]
+        tokens = [t for t in tokens if t]
+        stripped = [t for t in tokens if t not in TITLES]
+        # a bare title ("Captain") stays its own key
+        return tuple(stripped or tokens)
+
+    @staticmethod
+    def title_gender(name: str) -> str | None:
+        """'Mrs. Bennet' -> 'f', 'Mr. Bennet' -> 'm', 'Bennet' or 'Dr. Bennet' -> None"""
+        tokens = re.sub(r"[^\w\s'-]", " ", unicodedata.normalize("NFKC", name).casefold()).split()
+        for token in tokens:
+            if token in MALE_TITLES:
+                return "m"
+            if token in FEMALE_TITLES:
+                return "f"
+        return None
+
+    def _canonical_tokens(self, tokens: set[str]) -> dict[str, str]:
+        """
+        Maps spelling variants of name tokens ("elisabeth" -> "elizabeth")
+        onto one representative. Candidates come from a trigram index and are
+        confirmed by edit similarity; very short tokens are never merged.
+        """
+        tokens = sorted(t for t in tokens if len(t) >= 5 and t not in TITLES)
+        grams = {t: self._trigrams(t) for t in tokens}
+        gram_index: dict[str, list[str]] = defaultdict(list)
+        for token, token_grams in grams.items():
+            for gram in token_grams:
+                gram_index[gram].append(token)
+
+        # prefix filter: two tokens sharing half of the smaller gram set must
+        # share one of the smaller token's rarest len - len // 2 grams;
+        # grams found in a large part of the vocabulary are never probed
+        max_posting = max(100, len(tokens) // 10)
+        size = {t: len(token_grams) for t, token_grams in grams.items()}
+
+        parent = {t: t for t in tokens}
+        for token in tokens:
+            token_grams = grams[token]
+            ordered = sorted(token_grams, key=lambda g: (len(gram_index[g]), g))
+            prefix = ordered[: len(ordered) - (len(ordered) + 1) // 2 + 1]
+            own_rank = (size[token], token)
+            candidates = {
+                other
+                for gram in prefix if len(gram_index[gram]) <= max_posting
+                for other in gram_index[gram]
+                if (size[other], other) > own_rank
+            }
+            matcher = SequenceMatcher(None, "", token)
+            for other in candidates:
+                if len(token_grams & grams[other]) * 2 < len(token_grams):
+                    continue
+                if self._find(parent, token) == self._find(parent, other):
+                    continue
+                matcher.set_seq1(other)
+                if (
+                    matcher.real_quick_ratio() >= self.similarity_threshold
+                    and matcher.quick_ratio() >= self.similarity_threshold
+                    and matcher.ratio() >= self.similarity_threshold
+                ):
+                    self._union(parent, token, other)
+        return {t: self._find(parent, t) for t in tokens}
+
+    @staticmethod
+    def _find(parent: dict, key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    @classmethod
+    def _union(cls, parent: dict, a, b, gender: dict | None = None) -> None:
+        ra, rb = cls._find(parent, a), cls._find(parent, b)
+        if ra == rb:
+            return
+        if gender is not None:
+            if gender[ra] and gender[rb] and gender[ra] != gender[rb]:
+                return
+            gender[ra] = gender[ra] or gender[rb]
+        parent[rb] = ra
+
+    @classmethod
+    def _compatible(cls, gender: dict, parent: dict, short, full) -> bool:
+        """
+        Whether the cluster of a short form may join the cluster of a longer
+        name. A titled short form ("Mrs. Bennet") needs the same title gender
+        on the other side, a name without title ("Elizabeth Bennet") is no
+        evidence that both are the same person.
+        """
+        g_short, g_full = gender[cls._find(parent, short)], gender[cls._find(parent, full)]
+        return g_short is None or g_short == g_full
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        padded = f"  {text} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def _pick_candidate(key, candidates, key_chunks, key_count):
+        """
+        Picks the superset key a shorter key should join. Even a single
+        candidate needs co-occurrence evidence (shared chunks or items),
+        several candidates must be separated by it (shared chunks first, then
+        shared items/chapters).
+        """
+        if not candidates:
+            return None
+
+        chunks = key_chunks[key]
+        items = {c.split(".")[0] for c in chunks}
+
+        def score(other):
+            other_chunks = key_chunks[other]
+            other_items = {c.split(".")[0] for c in other_chunks}
+            return (len(chunks & other_chunks), len(items & other_items), key_count[other])
+
+        ranked = sorted(candidates, key=score, reverse=True)
+        best = score(ranked[0])
+        runner_up = score(ranked[1]) if len(ranked) > 1 else (0, 0, 0)
+        if best[:2] == (0, 0) or best[:2] == runner_up[:2]:
+            return None  # ambiguous, e.g. "Bennet" with several Bennet sisters
+        return ranked[0]
+
+    @staticmethod
+    def _unique_group_name(name: str, groups: dict) -> str:
+        candidate, n = name, 2
+        while candidate in groups:
+            candidate = f"{name} ({n})"
+            n += 1
+        return candidate
@@ -0,0 +1,154 @@
+import json
+import os
+
+from all_speakers import SpeakerRegistry
+from alias_clustering import AliasClusterer, UNKNOWN
+
+
+class AliasStore:
+    """
+    Speaker groups ({group_name: [alias, ...]}, the shape returned by
+    SpeakerAliasUI.get_final_mapping()) that are kept in a JSON file, so a
+    mapping made once can be reused when a book is reprocessed or for the
+    next volume of a series.
+
+    Only exact names are mapped automatically. A speaker whose normalised
+    key (with the gender of its title) matches a stored alias, e.g. "Mr Darcy"
+    for a stored "Mr. Darcy", is only suggested for that group and still
+    counts as uncovered.
+    """
+
+    def __init__(self, groups: dict[str, list[str]] | None = None):
+        self.groups: dict[str, list[str]] = {}
+        self._exact: dict[str, str] = {}
+        self._normalised: dict[tuple, str] = {}
+        self.update(groups or {})
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- lookups ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def group_for(self, speaker: str) -> str | None:
+        return self._exact.get(speaker)
+
+    def suggested_group(self, speaker: str) -> str | None:
+        """Group of a stored alias with the same normalised key and title gender."""
+        return self._normalised.get(self._key(speaker))
+
+    def suggest(self, speakers) -> dict[str, list[str]]:
+        """Proposed groups for speakers without an exact match."""
+        suggestions: dict[str, list[str]] = {}
+        for speaker in self.uncovered(speakers):
+            group = self.suggested_group(speaker)
+            if group is not None:
+                suggestions.setdefault(group, []).append(speaker)
+        return suggestions
+
+    def apply(self, speakers) -> dict[str, list[str]]:
+        """Groups all speakers that are stored under their exact name."""
+        mapping: dict[str, list[str]] = {}
+        for speaker in speakers:
+            group = self.group_for(speaker)
+            if group is not None:
+                mapping.setdefault(group, []).append(speaker)
+        return mapping
+
+    def uncovered(self, speakers) -> list[str]:
+        """Speakers without a group, "Unknown" never needs one."""
+        return [
+            speaker for speaker in speakers
+            if self.group_for(speaker) is None
+            and AliasClusterer.normalise(speaker) not in ((UNKNOWN,), ())
+        ]
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- updates ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def update(self, mapping: dict[str, list[str]]) -> None:
+        """Merges a mapping into the store, an alias moves to its latest group."""
+        for group, aliases in mapping.items():
+            for alias in aliases:
+                previous = self._exact.get(alias)
+                if previous == group:
+                    continue
+                if previous is not None:
+                    self.groups[previous].remove(alias)
+                    if not self.groups[previous]:
+                        del self.groups[previous]
+                self.groups.setdefault(group, []).append(alias)
+                self._exact[alias] = group
+                key = self._key(alias)
+                if key[0] and key[0] != (UNKNOWN,):
+                    self._normalised[key] = group
+
+    def resolve(self, speaker_registry: SpeakerRegistry, headless: bool = False) -> dict[str, list[str]]:
+        """
+        Returns the final mapping for the speakers of a run and stores it.
+        Speakers stored under their exact name are mapped automatically. The
+        GUI only opens when there are uncovered speakers and `headless` is
+        off, with the stored groups, the suggestions for spelling variants and
+        the AliasClusterer proposals preloaded. In headless mode the
+        suggestions are taken and the remaining speakers are grouped by
+        AliasClusterer.
+        """
+        speakers = speaker_registry.names()
+        known = self.apply(speakers)
+        uncovered = self.uncovered(speakers)
+
+        if not uncovered:
+            print("[AliasStore] All speakers are covered by stored aliases.")
+            return known
+
+        suggestions = self.suggest(uncovered)
+        preloaded = {group: list(aliases) for group, aliases in known.items()}
+        for group, aliases in suggestions.items():
+            preloaded.setdefault(group, []).extend(aliases)
+        suggested_speakers = {speaker for aliases in suggestions.values() for speaker in aliases}
+        rest = [speaker for speaker in uncovered if speaker not in suggested_speakers]
+
+        if headless:
+            clustered = AliasClusterer(speaker_registry.subset(rest)).cluster(include_singletons=True)
+            print(
+                f"[AliasStore] {len(suggested_speakers)} spelling variants added to stored groups, "
+                f"{len(rest)} new speakers grouped automatically."
+            )
+            final_mapping = self._combine(clustered, preloaded)
+        else:
+            import tkinter as tk
+            from gui import SpeakerAliasUI
+
+            clustered = AliasClusterer(speaker_registry.subset(rest)).cluster()
+            root = tk.Tk()
+            app = SpeakerAliasUI(root, speaker_registry, suggested_groups=self._combine(clustered, preloaded))
+            root.mainloop()
+            final_mapping = app.get_final_mapping()
+
+        self.update(final_mapping)
+        return final_mapping
+
+    @staticmethod
+    def _combine(clustered: dict, preloaded: dict) -> dict[str, list[str]]:
+        """New groups next to the stored ones, a new group named like a stored one is renamed, not dropped."""
+        combined = {}
+        for group, aliases in clustered.items():
+            combined[AliasClusterer._unique_group_name(group, {**preloaded, **combined})] = aliases
+        combined.update(preloaded)
+        return combined
+
+    @staticmethod
+    def _key(name: str) -> tuple:
+        return AliasClusterer.normalise(name), AliasClusterer.title_gender(name)
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- serialisation ---------------------------- #
+    # --------------------------------------------------------------------- #
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.groups, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "AliasStore":
+        """Loads a store, a missing file gives an empty one."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
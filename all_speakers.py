@@ -1,8 +1,108 @@
+import json
+import threading
+from collections import Counter
 
-class AllSpeakers:
-    all_speakers = set()
 
-    @staticmethod
-    def enrich_speaker_set(speakers):
-        AllSpeakers.all_speakers.update(speakers)
-        print(AllSpeakers.all_speakers)
\ No newline at end of file
+class SpeakerRegistry:
+    """
+    Collects every speaker name detected during a run together with its
+    number of occurrences and the chunk indexes (e.g. "3.12") it appears in.
+    All updates are guarded by a lock, so one registry can be shared between
+    several indexer threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        # name -> {chunk_index: occurrences}, in order of first appearance
+        self._locations: dict[str, dict[str, int]] = {}
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- updates ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def add(self, speakers, chunk_index: str | None = None) -> None:
+        """Registers one occurrence per entry in `speakers`."""
+        with self._lock:
+            for name in speakers:
+                self._counts[name] += 1
+                chunks = self._locations.setdefault(name, {})
+                if chunk_index is not None:
+                    chunks[chunk_index] = chunks.get(chunk_index, 0) + 1
+
+    def merge(self, other: "SpeakerRegistry") -> None:
+        """Adds all counts and locations of another registry to this one."""
+        snapshot = other.to_dict()
+        with self._lock:
+            for name, entry in snapshot.items():
+                self._counts[name] += entry["count"]
+                chunks = self._locations.setdefault(name, {})
+                for chunk_index, n in entry["chunks"].items():
+                    chunks[chunk_index] = chunks.get(chunk_index, 0) + n
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- queries ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def names(self) -> list[str]:
+        """All names in order of first appearance."""
+        with self._lock:
+            return list(self._locations)
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return self._counts.get(name, 0)
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def locations(self, name: str) -> list[str]:
+        """Chunk indexes the name occurs in, in order of first appearance."""
+        with self._lock:
+            return list(self._locations.get(name, {}))
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        with self._lock:
+            return self._counts.most_common(n)
+
+    def subset(self, names) -> "SpeakerRegistry":
+        """A new registry holding only the given names."""
+        snapshot = self.to_dict()
+        return SpeakerRegistry.from_dict({n: snapshot[n] for n in names if n in snapshot})
+
+    def __contains__(self, name) -> bool:
+        with self._lock:
+            return name in self._locations
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._locations)
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- serialisation ---------------------------- #
+    # --------------------------------------------------------------------- #
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                name: {"count": self._counts[name], "chunks": dict(chunks)}
+                for name, chunks in self._locations.items()
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpeakerRegistry":
+        registry = cls()
+        for name, entry in data.items():
+            registry._counts[name] = entry.get("count", 0)
+            registry._locations[name] = dict(entry.get("chunks", {}))
+        return registry
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "SpeakerRegistry":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -1,36 +1,100 @@
 import os
+import json
+import threading
+import time
+from contextlib import nullcontext
 from openai import OpenAI
 import re
 
-class OpenAIClient:
+# thread-safe counters of the requests a client made
+class ApiUsage:
     def __init__(self):
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=openai_api_key)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
 
-    # prescan the text to get the speakers mentioned in it for each chunk
-    def prescan(self, text):
-        prescan_prompt = """
-        Analyze the following text and identify all mentioned speakers and scenes.
-        Return ONLY all the speakers in the text in following format:
-        - Speaker 1 (e.g. John Doe)
-        - Speaker 2 (e.g. Jane)
-        """
-        messages = [
-            {"role": "system", "content": prescan_prompt},
-            {"role": "user", "content": text}
-        ]
-        response = self.client.chat.completions.create(
-            messages=messages,
-            model="gpt-4o-mini",
-            temperature=0
+    def record(self, prompt_tokens=0, completion_tokens=0, seconds=0.0):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.seconds += seconds
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "api_seconds": round(self.seconds, 2),
+            }
+
+# shared request handling of the API clients
+class ChatClient:
+    def __init__(self, request_limiter=None):
+        # e.g. a threading.BoundedSemaphore shared by all clients of a process to cap concurrent requests
+        self.request_limiter = request_limiter
+        self.usage = ApiUsage()
+
+    def _complete(self, **kwargs):
+        with self.request_limiter or nullcontext():
+            start = time.perf_counter()
+            response = self.client.chat.completions.create(**kwargs)
+            seconds = time.perf_counter() - start
+        usage = getattr(response, "usage", None)
+        self.usage.record(
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+            seconds,
+        )
+        return response
+
+    def _stream(self, **kwargs):
+        """Yields the content deltas of a streamed completion, usage comes with the last event."""
+        with self.request_limiter or nullcontext():
+            start = time.perf_counter()
+            stream = self.client.chat.completions.create(
+                stream=True, stream_options={"include_usage": True}, **kwargs
+            )
+            usage = None
+            for event in stream:
+                if getattr(event, "usage", None):
+                    usage = event.usage
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+            seconds = time.perf_counter() - start
+        self.usage.record(
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+            seconds,
         )
 
+
+class OpenAIClient(ChatClient):
+    # model tiers for ModelRouter, "cheap" is the default
+    MODELS = {"cheap": "gpt-4o-mini", "strong": "gpt-4o"}
+
+    def __init__(self, request_limiter=None):
+        super().__init__(request_limiter)
+        openai_api_key = os.environ.get("OPENAI_API_KEY")
+        self.client = OpenAI(api_key=openai_api_key)
+
+    # get the speakers from the API response
+    def get_speakers(self, conversation_history, model=None):
+        response = self._complete(**self._speakers_request(conversation_history, model))
         result = response.choices[0].message.content
-        print("Prescan:", result)
+        print("Get Speakers:", result)
         return result
 
-    # get the speakers from the API response
-    def get_speakers(self, conversation_history):
+    # same as get_speakers, but yields the answer in pieces while it is generated
+    def stream_speakers(self, conversation_history, model=None):
+        yield from self._stream(**self._speakers_request(conversation_history, model))
+
+    # request arguments for get_speakers and stream_speakers, needs no API key (used by the dry run)
+    @classmethod
+    def _speakers_request(cls, conversation_history, model=None):
         speakers_prompt = """
         Analyze the text and identify the speaker for EACH numbered speech and thought segment.
         
@@ -58,15 +122,12 @@ class OpenAIClient:
         conversation = list(conversation_history)
         conversation.append({"role": "system", "content": speakers_prompt})
         
-        response = self.client.chat.completions.create(
+        return dict(
             messages=conversation,
-            model="gpt-4o-mini",
+            model=model or cls.MODELS["cheap"],
             temperature=0,
             response_format={"type": "json_object"}
         )
-        result = response.choices[0].message.content
-        print("Get Speakers:", result)
-        return result
 
     # summarize the context to provide a brief overview of the text for the next chunk
     def summarize_context(self, text):
@@ -80,7 +141,7 @@ class OpenAIClient:
             {"role": "system", "content": summary_prompt},
             {"role": "user", "content": text}
         ]
-        response = self.client.chat.completions.create(
+        response = self._complete(
             messages=messages,
             model="gpt-4o-mini",
             temperature=0
@@ -90,36 +151,29 @@ class OpenAIClient:
         return result
     
 # DeepSeek API client
-class DeepSeekClient:
-    def __init__(self):
+class DeepSeekClient(ChatClient):
+    # model tiers for ModelRouter, "cheap" is the default
+    MODELS = {"cheap": "deepseek-chat", "strong": "deepseek-reasoner"}
+
+    def __init__(self, request_limiter=None):
+        super().__init__(request_limiter)
         deepseek_api_key = os.environ.get("DEEPSEEK_API_KEY")
         self.client = OpenAI(api_key=deepseek_api_key, base_url="https://api.deepseek.com")
 
-    # prescan the text to get the speakers mentioned in it for each chunk
-    def prescan(self, text):
-        prescan_prompt = """
-        Analyze the following text and identify all mentioned speakers and scenes.
-        Return ONLY all the speakers in the text in following format:
-        - Speaker 1 (e.g. John Doe)
-        - Speaker 2 (e.g. Jane)
-        """
-        messages = [
-            {"role": "system", "content": prescan_prompt},
-            {"role": "user", "content": text}
-        ]
-        response = self.client.chat.completions.create(
-            messages=messages,
-            model="deepseek-chat",
-            temperature=0
-        )
-
+    # get the speakers from the API response
+    def get_speakers(self, conversation_history, model=None):
+        response = self._complete(**self._speakers_request(conversation_history, model))
         result = response.choices[0].message.content
-        print("Prescan:", result)
+        print("Get Speakers:", result)
         return result
 
-    # get the speakers from the API response
-    def get_speakers(self, conversation_history):
-        
+    # same as get_speakers, but yields the answer in pieces while it is generated
+    def stream_speakers(self, conversation_history, model=None):
+        yield from self._stream(**self._speakers_request(conversation_history, model))
+
+    # request arguments for get_speakers and stream_speakers, needs no API key (used by the dry run)
+    @classmethod
+    def _speakers_request(cls, conversation_history, model=None):
         user_content = ""
         for msg in reversed(conversation_history):
             if msg["role"] == "user":
@@ -169,14 +223,11 @@ class DeepSeekClient:
             "content": "Provide your response as a valid JSON object ONLY, with no additional text. Include entries for ALL indices."
         })
         
-        response = self.client.chat.completions.create(
+        return dict(
             messages=conversation,
-            model="deepseek-chat",
+            model=model or cls.MODELS["cheap"],
             temperature=0.7
         )
-        result = response.choices[0].message.content
-        print("Get Speakers:", result)
-        return result
 
     # summarize the context to provide a brief overview of the text for the next chunk
     def summarize_context(self, text):
@@ -190,11 +241,65 @@ class DeepSeekClient:
             {"role": "system", "content": summary_prompt},
             {"role": "user", "content": text}
         ]
-        response = self.client.chat.completions.create(
+        response = self._complete(
             messages=messages,
             model="deepseek-chat",
             temperature=0.7
         )
         result = response.choices[0].message.content
         print("Summarize Context:", result)
-        return result
\ No newline at end of file
+        return result
+
+# offline stand-in for the API clients, used for benchmarks and local testing
+class OfflineClient:
+    MODELS = {"cheap": "offline", "strong": "offline"}
+
+    def __init__(self, latency=0.0, request_limiter=None):
+        # simulated seconds per request
+        self.latency = latency
+        self.request_limiter = request_limiter
+        self.usage = ApiUsage()
+
+    def _wait(self):
+        with self.request_limiter or nullcontext():
+            time.sleep(self.latency)
+        self.usage.record(seconds=self.latency)
+
+    def get_speakers(self, conversation_history, model=None):
+        result = self._speakers_answer(conversation_history)
+        self._wait()
+        return result
+
+    # the latency is spread over the pieces, like a model generating its answer
+    def stream_speakers(self, conversation_history, model=None):
+        result = self._speakers_answer(conversation_history)
+        pieces = [result[start : start + 8] for start in range(0, len(result), 8)]
+        with self.request_limiter or nullcontext():
+            for piece in pieces:
+                time.sleep(self.latency / len(pieces))
+                yield piece
+        self.usage.record(seconds=self.latency)
+
+    # answers with the name next to a speech verb after each segment, "Unknown" otherwise
+    def _speakers_answer(self, conversation_history):
+        user_content = ""
+        for msg in reversed(conversation_history):
+            if msg["role"] == "user":
+                user_content = msg["content"]
+                break
+
+        result = {"speech": {}, "thought": {}}
+        for category, tag in (("speech", "speech"), ("thought", "em")):
+            for match in re.finditer(fr'<{tag} index="(\d+)">', user_content):
+                following = re.sub(r"<[^>]+>", " ", user_content[match.end() : match.end() + 300])
+                name = re.search(
+                    r"\b(?:said|asked|replied|thought|cried|whispered)\s+([A-Z][a-z]+)"
+                    r"|\b([A-Z][a-z]+)\s+(?:said|asked|replied|thought|cried|whispered)\b",
+                    following,
+                )
+                result[category][match.group(1)] = (name.group(1) or name.group(2)) if name else "Unknown"
+        return json.dumps(result)
+
+    def summarize_context(self, text):
+        self._wait()
+        return "n/a"
@@ -1,57 +1,137 @@
 from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
 import json
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
 import ebooklib
 from ebooklib import epub
 from bs4 import BeautifulSoup
 
 # the part to modify in order to run the benchmark is at the bottom of this file
 
+CACHE_DIR = ".benchmark_cache"
+CACHE_VERSION = "1"  # bump when the extracted structure changes
+
+# (maps, seq, items), see _assemble
+ParsedEpub = Tuple[
+    Dict[str, Dict[str, str]],
+    Dict[str, List[str]],
+    Dict[str, List[Tuple[str, List[Tuple[str, str]]]]],
+]
+
 class EpubBenchmark:
     # ------------------------------------------------------------------ #
     # Construction & parsing                                             #
     # ------------------------------------------------------------------ #
-    def __init__(self, gt_path: str, test_path: str) -> None:
-        self.gt_maps, self.gt_seq = self._parse_epub(gt_path)
-        self.test_maps, self.test_seq = self._parse_epub(test_path)
+    def __init__(
+        self,
+        gt_path: str,
+        test_path: str,
+        mode: str = "position",
+        cache_dir: str | None = None,
+        workers: int | None = 1,
+    ) -> None:
+        """
+        mode = "position"  -> the n-th tag of both books is compared
+        mode = "alignment" -> tags are aligned by their text first, so a
+                              missing or extra tag only costs itself
 
-    @staticmethod
-    def _parse_epub(
-        file_path: str,
-    ) -> Tuple[Dict[str, Dict[str, str]], Dict[str, List[str]]]:
+        By default both books are parsed in this process without a cache.
+        Pass `cache_dir` (e.g. CACHE_DIR) to cache the extracted tags and
+        `workers` (None for one per CPU) to parse items in a process pool.
         """
-        Returns two structures:
+        parsed = self._load_epubs([gt_path, test_path], cache_dir, workers)
+        self._init_parsed(parsed[gt_path], parsed[test_path], mode)
+
+    def _init_parsed(self, gt_parsed: ParsedEpub, test_parsed: ParsedEpub, mode: str) -> None:
+        if mode not in ("position", "alignment"):
+            raise ValueError("Invalid benchmark mode specified.")
+        self.mode = mode
+        self.gt_maps, self.gt_seq, self.gt_items = gt_parsed
+        self.test_maps, self.test_seq, self.test_items = test_parsed
 
-        maps[cat][key]   -> speaker               (random order)
-        seq[cat]         -> [speaker0, …]         (document order)
+    @classmethod
+    def compare_many(
+        cls,
+        gt_path: str,
+        test_paths: List[str],
+        mode: str = "position",
+        cache_dir: str | None = CACHE_DIR,
+        workers: int | None = None,
+    ) -> Dict[str, Dict[str, float]]:
         """
-        book = epub.read_epub(file_path)
-        items = book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
+        Scores several test outputs against one ground truth, which is only
+        parsed once. Returns {test_path: generate_report()}. Extracted tags
+        are cached in `cache_dir` (None disables the cache), items are parsed
+        by `workers` processes (None for one per CPU).
+        """
+        parsed = cls._load_epubs([gt_path, *test_paths], cache_dir, workers)
+        reports = {}
+        for test_path in test_paths:
+            bm = cls.__new__(cls)
+            bm._init_parsed(parsed[gt_path], parsed[test_path], mode)
+            reports[test_path] = bm.generate_report()
+        return reports
 
-        maps: Dict[str, Dict[str, str]] = {"speech": {}, "thought": {}}
-        seq: Dict[str, List[str]] = {"speech": [], "thought": []}
+    @staticmethod
+    def _load_epubs(
+        paths: List[str], cache_dir: str | None, workers: int | None
+    ) -> Dict[str, ParsedEpub]:
+        """
+        Returns {path: (maps, seq, items)} (see _assemble). Books found in the
+        cache (keyed by the SHA-256 of the file) are not parsed again, the
+        items of all other books are parsed in one process pool.
+        """
+        parsed: Dict[str, ParsedEpub] = {}
+        pending: Dict[str, Tuple[str, List[str]]] = {}  # path -> (hash, item ids)
+        jobs: List[Tuple[str, bytes]] = []
 
-        for item in items:
-            soup = BeautifulSoup(
-                item.get_body_content().decode("utf-8"), "html.parser"
-            )
+        for path in dict.fromkeys(paths):
+            digest = _file_hash(path)
+            cached = _read_cache(cache_dir, digest)
+            if cached is not None:
+                parsed[path] = cached
+                continue
+            book = epub.read_epub(path)
+            item_ids = []
+            for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+                item_ids.append(item.id)
+                jobs.append((item.id, item.get_body_content()))
+            pending[path] = (digest, item_ids)
 
-            for i, tag in enumerate(soup.find_all("speech")):
-                speaker = (tag.get("speaker") or "Unknown").strip()
-                maps["speech"][f"{item.id}_{i}"] = speaker
-                seq["speech"].append(speaker)
+        if jobs:
+            if len(jobs) > 1 and workers != 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    item_tags = list(pool.map(_extract_item_tags, jobs, chunksize=8))
+            else:
+                item_tags = [_extract_item_tags(job) for job in jobs]
 
-            for i, tag in enumerate(soup.find_all("thought")):
-                speaker = (tag.get("speaker") or "Unknown").strip()
-                maps["thought"][f"{item.id}_{i}"] = speaker
-                seq["thought"].append(speaker)
+            position = 0
+            for path, (digest, item_ids) in pending.items():
+                book_tags = item_tags[position : position + len(item_ids)]
+                position += len(item_ids)
+                parsed[path] = _assemble(list(zip(item_ids, book_tags)))
+                _write_cache(cache_dir, digest, parsed[path])
 
-        return maps, seq
+        return parsed
+
+    @staticmethod
+    def _parse_epub(file_path: str) -> ParsedEpub:
+        """Parses a single book without cache, see _assemble for the result."""
+        return EpubBenchmark._load_epubs([file_path], None, 1)[file_path]
 
     # ------------------------------------------------------------------ #
     # Accuracy helpers                                                   #
     # ------------------------------------------------------------------ #
     def _matches_and_total(self, cat: str) -> Tuple[int, int]:
         """(#matches, total positions) for the given category."""
+        if self.mode == "alignment":
+            counts = self._alignment_counts(cat)
+            return counts["matches"], counts["total"]
+
         gt, test = self.gt_seq[cat], self.test_seq[cat]
         total = max(len(gt), len(test))
         matches = sum(
@@ -73,7 +153,7 @@ class EpubBenchmark:
         total_ok = sp_ok + th_ok
         total_cnt = sp_tot + th_tot
 
-        return {
+        report = {
             "speech_accuracy": sp_ok / sp_tot if sp_tot else 0,
             "thought_accuracy": th_ok / th_tot if th_tot else 0,
             "overall_accuracy": total_ok / total_cnt if total_cnt else 0,
@@ -87,6 +167,59 @@ class EpubBenchmark:
             == len(self.test_seq["thought"]),
         }
 
+        if self.mode == "alignment":
+            # accuracy over the aligned pairs only, gaps are counted separately
+            for cat in ("speech", "thought"):
+                counts = self._alignment_counts(cat)
+                report[f"{cat}_aligned"] = counts["aligned"]
+                report[f"{cat}_aligned_accuracy"] = (
+                    counts["matches"] / counts["aligned"] if counts["aligned"] else 0
+                )
+                report[f"{cat}_deletions"] = counts["deletions"]
+                report[f"{cat}_insertions"] = counts["insertions"]
+        return report
+
+    def tier_report(self, tiers_path: str) -> Dict[str, Dict[str, float]]:
+        """
+        Accuracies per model tier of a routed run, from the tier file written
+        next to its output (<output>.tiers.json with cli.py, tiers.json with
+        main.py). The tags of the test book are assigned to the chunks in
+        book order by their segment counts. Tags of the ground truth that
+        are missing in the test book count as "untracked".
+        """
+        with open(tiers_path, encoding="utf-8") as f:
+            chunk_tiers = json.load(f)
+        tag_tiers: Dict[str, List[str]] = {"speech": [], "thought": []}
+        for chunk in chunk_tiers.values():
+            for cat in ("speech", "thought"):
+                tag_tiers[cat].extend([chunk["tier"]] * chunk[cat])
+
+        counts: Dict[str, Dict[str, int]] = {}
+        for cat in ("speech", "thought"):
+            for row in self.compare_tags(cat):
+                test_i = row.get("test_index", row["index"])
+                if test_i is None or test_i >= len(self.test_seq[cat]) or test_i >= len(tag_tiers[cat]):
+                    tier = "untracked"
+                else:
+                    tier = tag_tiers[cat][test_i]
+                tier_counts = counts.setdefault(
+                    tier, {"speech_ok": 0, "speech": 0, "thought_ok": 0, "thought": 0}
+                )
+                tier_counts[cat] += 1
+                tier_counts[f"{cat}_ok"] += row["match"]
+
+        report = {}
+        for tier, c in counts.items():
+            total = c["speech"] + c["thought"]
+            report[tier] = {
+                "speech_accuracy": c["speech_ok"] / c["speech"] if c["speech"] else 0,
+                "thought_accuracy": c["thought_ok"] / c["thought"] if c["thought"] else 0,
+                "overall_accuracy": (c["speech_ok"] + c["thought_ok"]) / total if total else 0,
+                "speech_count": c["speech"],
+                "thought_count": c["thought"],
+            }
+        return report
+
     def compare_tags(
         self, category: str = "speech"
     ) -> List[Dict[str, str | int | bool]]:
@@ -100,7 +233,15 @@ class EpubBenchmark:
               "test_output"  : str,
               "match"        : bool
             }
+
+        In alignment mode every row additionally carries
+              "op"           : "aligned" | "deletion" | "insertion"
+              "test_index"   : int | None   (position in the test book)
+        and "MISSING" marks the side of a gap.
         """
+        if self.mode == "alignment":
+            return self._aligned_rows(category)
+
         gt, test = self.gt_seq[category], self.test_seq[category]
         total = max(len(gt), len(test))
         rows = []
@@ -118,11 +259,356 @@ class EpubBenchmark:
             )
         return rows
 
+    # ------------------------------------------------------------------ #
+    # Alignment                                                          #
+    # ------------------------------------------------------------------ #
+    def _aligned_rows(self, cat: str) -> List[Dict[str, str | int | bool]]:
+        """Aligns the tags item by item, items are paired by their id."""
+        rows = []
+        gt_items, test_items = self.gt_items[cat], self.test_items[cat]
+        test_by_id = dict(test_items)
+        # position of the first tag of every test item in the test book
+        test_starts, start = [], 0
+        for _, tags in test_items:
+            test_starts.append(start)
+            start += len(tags)
+        start_by_id = {item_id: test_starts[i] for i, (item_id, _) in enumerate(test_items)}
+
+        if not test_by_id.keys() & dict(gt_items).keys():
+            # different manifests, fall back to the item order
+            pairs = [
+                (gt_items[i][1] if i < len(gt_items) else [],
+                 test_items[i][1] if i < len(test_items) else [],
+                 test_starts[i] if i < len(test_items) else 0)
+                for i in range(max(len(gt_items), len(test_items)))
+            ]
+        else:
+            gt_ids = {item_id for item_id, _ in gt_items}
+            pairs = [
+                (tags, test_by_id.get(item_id, []), start_by_id.get(item_id, 0))
+                for item_id, tags in gt_items
+            ]
+            pairs += [([], tags, start_by_id[item_id]) for item_id, tags in test_items if item_id not in gt_ids]
+
+        for gt_tags, test_tags, test_start in pairs:
+            for gt_i, test_i in _align(
+                [text for text, _ in gt_tags], [text for text, _ in test_tags]
+            ):
+                gt_spk = gt_tags[gt_i][1] if gt_i is not None else "MISSING"
+                test_spk = test_tags[test_i][1] if test_i is not None else "MISSING"
+                if gt_i is None:
+                    op = "insertion"
+                elif test_i is None:
+                    op = "deletion"
+                else:
+                    op = "aligned"
+                rows.append(
+                    {
+                        "index": len(rows),
+                        "ground_truth": gt_spk,
+                        "test_output": test_spk,
+                        "match": op == "aligned"
+                        and gt_spk.strip().casefold() == test_spk.strip().casefold(),
+                        "op": op,
+                        "test_index": test_start + test_i if test_i is not None else None,
+                    }
+                )
+        return rows
+
+    def _alignment_counts(self, cat: str) -> Dict[str, int]:
+        if not hasattr(self, "_alignment_cache"):
+            self._alignment_cache: Dict[str, Dict[str, int]] = {}
+        if cat not in self._alignment_cache:
+            rows = self._aligned_rows(cat)
+            self._alignment_cache[cat] = {
+                "matches": sum(1 for r in rows if r["match"]),
+                "aligned": sum(1 for r in rows if r["op"] == "aligned"),
+                "deletions": sum(1 for r in rows if r["op"] == "deletion"),
+                "insertions": sum(1 for r in rows if r["op"] == "insertion"),
+                "total": len(rows),
+            }
+        return self._alignment_cache[cat]
+
+
+# ------------------------------------------------------------------ #
+# Parsing & cache helpers                                            #
+# ------------------------------------------------------------------ #
+def _extract_item_tags(job: Tuple[str, bytes]) -> Dict[str, List[Tuple[str, str]]]:
+    """[(text, speaker), …] per category for one document item (runs in a worker process)."""
+    _, body = job
+    soup = BeautifulSoup(body.decode("utf-8"), "html.parser")
+    return {
+        cat: [
+            (_normalise_text(tag.get_text()), (tag.get("speaker") or "Unknown").strip())
+            for tag in soup.find_all(cat)
+        ]
+        for cat in ("speech", "thought")
+    }
+
+
+def _assemble(
+    item_tags: List[Tuple[str, Dict[str, List[Tuple[str, str]]]]]
+) -> ParsedEpub:
+    """
+    Builds three structures from the per-item tags:
+
+    maps[cat][key]   -> speaker               (random order)
+    seq[cat]         -> [speaker0, …]         (document order)
+    items[cat]       -> [(item_id, [(text, speaker), …]), …]
+                                              (document order, per item)
+    """
+    maps: Dict[str, Dict[str, str]] = {"speech": {}, "thought": {}}
+    seq: Dict[str, List[str]] = {"speech": [], "thought": []}
+    items: Dict[str, List[Tuple[str, List[Tuple[str, str]]]]] = {
+        "speech": [],
+        "thought": [],
+    }
+    for item_id, tags in item_tags:
+        for cat in ("speech", "thought"):
+            for i, (_, speaker) in enumerate(tags[cat]):
+                maps[cat][f"{item_id}_{i}"] = speaker
+                seq[cat].append(speaker)
+            items[cat].append((item_id, tags[cat]))
+    return maps, seq, items
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_dir: str | None, digest: str) -> ParsedEpub | None:
+    if cache_dir is None:
+        return None
+    path = os.path.join(cache_dir, f"{digest}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != CACHE_VERSION:
+        return None
+    items = {
+        cat: [(item_id, [tuple(tag) for tag in tags]) for item_id, tags in cat_items]
+        for cat, cat_items in data["items"].items()
+    }
+    return data["maps"], data["seq"], items
+
+
+def _write_cache(cache_dir: str | None, digest: str, parsed: ParsedEpub) -> None:
+    if cache_dir is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    maps, seq, items = parsed
+    path = os.path.join(cache_dir, f"{digest}.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": CACHE_VERSION, "maps": maps, "seq": seq, "items": items},
+            f,
+            ensure_ascii=False,
+        )
+    os.replace(path + ".tmp", path)
+
+
+def format_report_table(reports: Dict[str, Dict[str, float]]) -> str:
+    """One row per test output, for the reports of compare_many."""
+    columns = [
+        ("speech_accuracy", "speech"),
+        ("thought_accuracy", "thought"),
+        ("overall_accuracy", "overall"),
+        ("test_speech_count", "#speech"),
+        ("test_thought_count", "#thought"),
+        ("speech_insertions", "sp ins"),
+        ("speech_deletions", "sp del"),
+    ]
+    columns = [c for c in columns if any(c[0] in r for r in reports.values())]
+    name_width = max([len("test output")] + [len(p) for p in reports])
+
+    lines = [
+        f"{'test output':<{name_width}}" + "".join(f" {title:>9}" for _, title in columns)
+    ]
+    for path, report in reports.items():
+        cells = []
+        for key, _ in columns:
+            value = report.get(key, "")
+            cells.append(f" {value:>9.3f}" if isinstance(value, float) else f" {value:>9}")
+        lines.append(f"{path:<{name_width}}" + "".join(cells))
+    return "\n".join(lines)
+
+
+# ------------------------------------------------------------------ #
+# Alignment helpers                                                  #
+# ------------------------------------------------------------------ #
+_QUOTES = "„“”\"‚‘’»«›‹"
+GAP = -1
+MAX_CELLS = 250_000  # largest gap between anchors aligned exactly
+
+
+def _normalise_text(text: str) -> str:
+    return " ".join(text.strip().strip(_QUOTES).split()).casefold()
+
+
+@lru_cache(maxsize=1 << 16)
+def _words(text: str) -> frozenset:
+    return frozenset(re.findall(r"\w+", text))
+
+
+def _coarse_key(text: str) -> str:
+    """First few words only, survives differently placed tag boundaries."""
+    return " ".join(re.findall(r"\w+", text)[:4])
+
+
+def _pair_score(a: str, b: str) -> int:
+    """2 for the same text, 1 for an overlapping one, otherwise worse than two gaps."""
+    if a == b:
+        return 2
+    if a and b and (a in b or b in a):
+        return 1
+    words_a, words_b = _words(a), _words(b)
+    if words_a and words_b and len(words_a & words_b) * 2 >= len(words_a | words_b):
+        return 1
+    return 2 * GAP - 1
+
+
+def _align(
+    gt: List[str], test: List[str], coarse: bool = False
+) -> List[Tuple[int | None, int | None]]:
+    """
+    Aligns two tag text sequences, returns (gt_index, test_index) pairs in
+    order with None on the side of a gap.
+
+    Texts that occur exactly once in both sequences are used as anchors
+    (longest increasing subsequence, as in patience diff), only the short
+    stretches between anchors are aligned with Hirschberg's algorithm, which
+    needs linear memory.
+    """
+    key = _coarse_key if coarse else None
+    anchors = _unique_anchors(
+        [key(t) for t in gt] if key else gt, [key(t) for t in test] if key else test
+    )
+
+    pairs: List[Tuple[int | None, int | None]] = []
+    prev_gt, prev_test = 0, 0
+    for gt_i, test_i in anchors + [(len(gt), len(test))]:
+        pairs.extend(
+            _shift(_align_gap(gt[prev_gt:gt_i], test[prev_test:test_i], coarse), prev_gt, prev_test)
+        )
+        if gt_i < len(gt):
+            pairs.append((gt_i, test_i))
+        prev_gt, prev_test = gt_i + 1, test_i + 1
+    return pairs
+
+
+def _align_gap(
+    a: List[str], b: List[str], coarse: bool
+) -> List[Tuple[int | None, int | None]]:
+    """
+    Hirschberg for gaps up to MAX_CELLS. Larger gaps are anchored again on
+    coarse keys, and if that does not help either, cut in the middle of both
+    sides (tags are expected near the diagonal), which keeps the run time
+    bounded at the cost of exactness around the cut.
+    """
+    if len(a) * len(b) <= MAX_CELLS:
+        return _hirschberg(a, b)
+    if not coarse:
+        return _align(a, b, coarse=True)
+    mid_a, mid_b = len(a) // 2, len(b) // 2
+    return _align_gap(a[:mid_a], b[:mid_b], coarse) + _shift(
+        _align_gap(a[mid_a:], b[mid_b:], coarse), mid_a, mid_b
+    )
+
+
+def _shift(
+    pairs: List[Tuple[int | None, int | None]], di: int, dj: int
+) -> List[Tuple[int | None, int | None]]:
+    return [
+        (i + di if i is not None else None, j + dj if j is not None else None)
+        for i, j in pairs
+    ]
+
+
+def _unique_anchors(gt: List[str], test: List[str]) -> List[Tuple[int, int]]:
+    def unique_positions(seq):
+        positions: Dict[str, int] = {}
+        for i, text in enumerate(seq):
+            positions[text] = -1 if text in positions else i
+        return {text: i for text, i in positions.items() if i >= 0}
+
+    gt_unique, test_unique = unique_positions(gt), unique_positions(test)
+    candidates = sorted(
+        (i, test_unique[text]) for text, i in gt_unique.items() if text in test_unique
+    )
+
+    # longest increasing subsequence over the test positions
+    tails: List[int] = []
+    tail_idx: List[int] = []
+    prev: List[int] = [-1] * len(candidates)
+    for k, (_, test_i) in enumerate(candidates):
+        pos = bisect_left(tails, test_i)
+        if pos == len(tails):
+            tails.append(test_i)
+            tail_idx.append(k)
+        else:
+            tails[pos] = test_i
+            tail_idx[pos] = k
+        prev[k] = tail_idx[pos - 1] if pos else -1
+
+    anchors = []
+    k = tail_idx[-1] if tail_idx else -1
+    while k != -1:
+        anchors.append(candidates[k])
+        k = prev[k]
+    return anchors[::-1]
+
+
+def _nw_last_row(a: List[str], b: List[str]) -> List[int]:
+    """Last row of the Needleman-Wunsch score matrix, O(len(b)) memory."""
+    row = [j * GAP for j in range(len(b) + 1)]
+    for i, x in enumerate(a, 1):
+        diag, row[0] = row[0], i * GAP
+        for j, y in enumerate(b, 1):
+            best = max(diag + _pair_score(x, y), row[j] + GAP, row[j - 1] + GAP)
+            diag, row[j] = row[j], best
+    return row
+
+
+def _hirschberg(a: List[str], b: List[str]) -> List[Tuple[int | None, int | None]]:
+    if not a:
+        return [(None, j) for j in range(len(b))]
+    if not b:
+        return [(i, None) for i in range(len(a))]
+    if len(a) == 1:
+        scores = [_pair_score(a[0], y) for y in b]
+        j = max(range(len(b)), key=scores.__getitem__)
+        if scores[j] <= 2 * GAP:
+            return [(0, None)] + [(None, k) for k in range(len(b))]
+        return [(None, k) for k in range(j)] + [(0, j)] + [
+            (None, k) for k in range(j + 1, len(b))
+        ]
+
+    mid = len(a) // 2
+    left = _nw_last_row(a[:mid], b)
+    right = _nw_last_row(a[mid:][::-1], b[::-1])
+    split = max(range(len(b) + 1), key=lambda j: left[j] + right[len(b) - j])
+
+    return _hirschberg(a[:mid], b[:split]) + _shift(
+        _hirschberg(a[mid:], b[split:]), mid, split
+    )
+
+
 # ---------------------------main----------------------------------- #
 # how to run the benchmark script:
 # 1. Make sure you have a ground truth EPUB file with the expected speaker tags.
 # 2. Make sure you have a test EPUB file with the output of this program (default output.epub).
 # 3. Pass them in the constructor of EpubBenchmark and then run the script.
+#    Use mode="alignment" if the tag counts differ, so one missing or extra tag does not shift all later comparisons.
+# 4. To score several outputs (e.g. a sweep of configurations) against the same ground truth, pass all of them
+#    to EpubBenchmark.compare_many. It parses the books in a process pool and caches them in .benchmark_cache,
+#    keyed by their file hash. The two-book constructor does neither unless cache_dir/workers are passed.
+# 5. For a run with model routing, bm.tier_report("tiers.json") splits the accuracies by the tier (cheap, strong,
+#    escalated) that answered each chunk, compare them with the calls per tier to tune the routing threshold.
 
 if __name__ == "__main__":
     bm = EpubBenchmark("new_ground_truth.epub", "output.epub")
@@ -130,5 +616,10 @@ if __name__ == "__main__":
     print("Report:")
     print(json.dumps(bm.generate_report(), indent=2))
 
+    #print(json.dumps(bm.tier_report("tiers.json"), indent=2))
+
+    #reports = EpubBenchmark.compare_many("new_ground_truth.epub", ["output.epub", "output_deepseek.epub"])
+    #print(format_report_table(reports))
+
     #print("\n Speech tags:")
     #print(json.dumps(bm.compare_tags()[:40], indent=2))
\ No newline at end of file
@@ -0,0 +1,147 @@
+import html
+import math
+import re
+from collections import Counter
+
+from alias_clustering import TITLES
+from item_chunk import Chunk
+from model_router import COMMON_WORDS, SPEECH_VERBS
+
+NAME_TOKEN = r"[A-ZÄÖÜ][a-zäöüß'’-]+"
+TITLE_PATTERN = "|".join(sorted((t.capitalize() for t in TITLES), key=len, reverse=True))
+NAME_PATTERN = re.compile(
+    fr"\b(?:(?P<title>(?:{TITLE_PATTERN})\.?)\s+)?"
+    # a title starts the next name instead of continuing this one ("Then Mrs. Bennet")
+    fr"(?P<name>{NAME_TOKEN}(?:\s+(?!(?:{TITLE_PATTERN})\b){NAME_TOKEN}){{0,2}})"
+)
+VERB_BEFORE = re.compile(fr"\b(?:{SPEECH_VERBS})\s*$", re.IGNORECASE)
+# "Anna said", "Anna quietly said"
+VERB_AFTER = re.compile(fr"^\s+(?:\w+\s+)?(?:{SPEECH_VERBS})\b", re.IGNORECASE)
+QUOTES = "„“”\"‚‘’»«›‹"
+
+
+class CandidateIndex:
+    """
+    Book-wide index of candidate speaker names, built locally in one pass
+    over the raw chunks. Replaces the prescan request: candidates(index)
+    returns the ranked names for the prompt of a chunk.
+
+    A capitalised word counts as name if it appears capitalised in the middle
+    of sentences more often than in lower case anywhere in the book, so
+    sentence-initial words and common words drop out. Ranking prefers names
+    next to a speech verb in the chunk, then mentions in the chunk and the one
+    before it, then the frequency in the whole book.
+    """
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        self.chunk_order: list[str] = []
+        # per chunk: Counter of names and of names next to a speech verb
+        self.chunk_names: dict[str, Counter] = {}
+        self.chunk_verbs: dict[str, Counter] = {}
+        self.book_names: Counter = Counter()
+        self.book_verbs: Counter = Counter()
+        self._position: dict[str, int] = {}
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- public interface ------------------------- #
+    # --------------------------------------------------------------------- #
+    def build(self, chunks: list[Chunk]) -> "CandidateIndex":
+        capitalised_mid = Counter()
+        lower_case = Counter()
+        mentions = {}
+        # the same mention in many chunks shares one key
+        keys = {}
+        for chunk in chunks:
+            text = self._plain_text(chunk.get_content())
+            lower_case.update(re.findall(r"\b[a-zäöüß]+\b", text))
+            # identical mentions are counted, not stored again
+            found = Counter()
+            for match in NAME_PATTERN.finditer(text):
+                tokens = tuple(match.group("name").split())
+                sentence_start = match.group("title") is None and self._starts_sentence(text, match.start())
+                capitalised_mid.update(tokens[1:] if sentence_start else tokens)
+                near_verb = bool(
+                    VERB_BEFORE.search(text[max(0, match.start() - 30) : match.start()])
+                    or VERB_AFTER.match(text[match.end() : match.end() + 40])
+                )
+                key = (match.group("title"), tokens, sentence_start, near_verb)
+                found[keys.setdefault(key, key)] += 1
+            mentions[chunk.get_index()] = tuple(found.items())
+            self.chunk_order.append(chunk.get_index())
+
+        def is_name(token):
+            return token not in COMMON_WORDS and capitalised_mid[token] > lower_case[token.lower()]
+
+        for chunk_index, found in mentions.items():
+            names, verbs = Counter(), Counter()
+            for (title, tokens, sentence_start, near_verb), count in found:
+                name = self._resolve(title, tokens, sentence_start, is_name)
+                if name is None:
+                    continue
+                names[name] += count
+                if near_verb:
+                    verbs[name] += count
+            self.chunk_names[chunk_index] = names
+            self.chunk_verbs[chunk_index] = verbs
+            self.book_names.update(names)
+            self.book_verbs.update(verbs)
+        self._position = {index: i for i, index in enumerate(self.chunk_order)}
+        return self
+
+    def candidates(self, chunk_index: str, limit: int | None = None) -> list[str]:
+        """Ranked candidate names for a chunk, most likely speaker first."""
+        names = self.chunk_names.get(chunk_index, Counter())
+        verbs = self.chunk_verbs.get(chunk_index, Counter())
+        previous = self._previous_chunk(chunk_index)
+        previous_names = self.chunk_names.get(previous, Counter()) if previous else Counter()
+
+        def score(name):
+            return (
+                3.0 * verbs[name]
+                + names[name]
+                + 0.5 * previous_names[name]
+                + math.log1p(self.book_verbs[name])
+                + 0.5 * math.log1p(self.book_names[name])
+            )
+
+        ranked = sorted(set(names) | set(previous_names), key=lambda n: (-score(n), n))
+        return ranked[: limit or self.limit]
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        return self.book_names.most_common(n)
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- helpers ------------------------------- #
+    # --------------------------------------------------------------------- #
+    @staticmethod
+    def _plain_text(content: str) -> str:
+        # block ends become sentence ends, inline tags are dropped
+        content = re.sub(r"</(?:p|div|h[1-6]|li)>|<br\s*/?>", ".\n", content)
+        return html.unescape(re.sub(r"<[^>]+>", "", content))
+
+    @staticmethod
+    def _starts_sentence(text: str, position: int) -> bool:
+        before = text[max(0, position - 6) : position].rstrip().rstrip(QUOTES).rstrip()
+        return not before or before[-1] in ".!?:"
+
+    @staticmethod
+    def _resolve(title, tokens, sentence_start, is_name) -> str | None:
+        tokens = list(tokens)
+        # "The", "When", ... in front of a name, or the first word of a sentence
+        while tokens and (tokens[0] in COMMON_WORDS or (sentence_start and not is_name(tokens[0]))):
+            tokens.pop(0)
+            sentence_start = False
+        while tokens and not is_name(tokens[-1]):
+            tokens.pop()
+        if not tokens or all(t.lower() in TITLES for t in tokens):
+            return None
+        return " ".join(([title] if title else []) + tokens)
+
+    def _previous_chunk(self, chunk_index: str) -> str | None:
+        position = self._position.get(chunk_index)
+        if not position:
+            return None
+        previous = self.chunk_order[position - 1]
+        # only within the same document item
+        return previous if previous.split(".")[0] == chunk_index.split(".")[0] else None
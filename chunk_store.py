@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+
+from item_chunk import Chunk
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class ChunkStore:
+    """
+    Append-only file of chunk contents with an in-memory offset index, so
+    raw and processed chunks of very large books do not have to stay in
+    memory. Every record is a JSON header line followed by the UTF-8 content:
+
+        {"kind": "raw", "index": "3.0", "length": 1834}\\n<content>
+
+    Writing a chunk again appends a new record, the index points to the latest
+    one. Contents are read back lazily with a seek per chunk; a memory map
+    would count every page read towards the resident memory. An existing file
+    is opened again by scanning its headers.
+    """
+
+    def __init__(self, path, truncate=False):
+        # truncate: start with an empty file instead of reopening an existing one
+        self.path = path
+        self._lock = threading.Lock()
+        # (kind, chunk index) -> (offset, length) of the content
+        self.offsets: dict[tuple[str, str], tuple[int, int]] = {}
+        # chunk indexes per kind in order of their first record
+        self.order: dict[str, list[str]] = {}
+        self._file = open(path, "w+b" if truncate else "a+b")
+        self._scan()
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- public interface ------------------------- #
+    # --------------------------------------------------------------------- #
+    def put(self, kind: str, chunk: Chunk) -> None:
+        data = chunk.get_content().encode("utf-8")
+        header = json.dumps({"kind": kind, "index": chunk.get_index(), "length": len(data)})
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(header.encode("utf-8") + b"\n")
+            offset = self._file.tell()
+            self._file.write(data)
+            self._add(kind, chunk.get_index(), offset, len(data))
+
+    def get(self, kind: str, chunk_index: str) -> Chunk:
+        offset, length = self.offsets[(kind, chunk_index)]
+        with self._lock:
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return Chunk(chunk_index, data.decode("utf-8"))
+
+    def indexes(self, kind: str) -> list[str]:
+        return list(self.order.get(kind, []))
+
+    def chunks(self, kind: str) -> "StoredChunks":
+        """List-like view of the chunks of one kind, see StoredChunks."""
+        return StoredChunks(self, kind)
+
+    def size(self) -> int:
+        """Bytes on disk."""
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            return self._file.tell()
+
+    def close(self, remove: bool = False) -> None:
+        with self._lock:
+            self._file.close()
+        if remove:
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- helpers ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def _add(self, kind, chunk_index, offset, length):
+        if (kind, chunk_index) not in self.offsets:
+            self.order.setdefault(kind, []).append(chunk_index)
+        self.offsets[(kind, chunk_index)] = (offset, length)
+
+    def _scan(self):
+        """Rebuilds the index of an existing file, a truncated last record is dropped."""
+        self._file.seek(0)
+        while True:
+            header_offset = self._file.tell()
+            line = self._file.readline()
+            if not line.endswith(b"\n"):
+                break
+            header = json.loads(line)
+            offset = self._file.tell()
+            self._file.seek(header["length"], os.SEEK_CUR)
+            if self._file.tell() > os.fstat(self._file.fileno()).st_size:
+                self._file.truncate(header_offset)
+                break
+            self._add(header["kind"], header["index"], offset, header["length"])
+
+
+class StoredChunks:
+    """
+    Stands in for the chunk lists of the pipeline: append() writes the chunk
+    to the store, iteration and indexing read the contents back one by one.
+    Only the chunk indexes are kept in memory.
+    """
+
+    def __init__(self, store: ChunkStore, kind: str):
+        self.store = store
+        self.kind = kind
+        self.chunk_indexes = store.indexes(kind)
+
+    def append(self, chunk: Chunk) -> None:
+        self.store.put(self.kind, chunk)
+        self.chunk_indexes.append(chunk.get_index())
+
+    def extend(self, chunks) -> None:
+        for chunk in chunks:
+            self.append(chunk)
+
+    def put(self, chunk: Chunk) -> None:
+        """Writes the chunk without adding it to the list, for chunks that are done out of order."""
+        self.store.put(self.kind, chunk)
+
+    def append_index(self, chunk_index: str) -> None:
+        """Adds a chunk written with put() to the end of the list."""
+        self.chunk_indexes.append(chunk_index)
+
+    def __getitem__(self, position: int) -> Chunk:
+        return self.store.get(self.kind, self.chunk_indexes[position])
+
+    def __iter__(self):
+        for chunk_index in self.chunk_indexes:
+            yield self.store.get(self.kind, chunk_index)
+
+    def __len__(self) -> int:
+        return len(self.chunk_indexes)
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident memory of this process so far, None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if os.uname().sysname == "Darwin" else 2**10), 1)
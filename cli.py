@@ -0,0 +1,263 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ebooklib import epub
+
+from epub_book_parser import EpubParser
+from indexer import SpeechIndexer
+from reparser import Reparser
+from alias_store import AliasStore
+from pipeline import index_chunks, index_chunks_by_item, save_chunk_tiers
+from estimator import DryRunEstimator
+from candidate_names import CandidateIndex
+from chunk_store import ChunkStore, peak_rss_mb
+
+# command line entry point for processing many books without the GUI, e.g.
+#   python cli.py "library/**/*.epub" --output-dir annotated --provider deepseek --workers 4 --max-requests 8
+
+
+def collect_epubs(inputs):
+    """Expands files, directories and glob patterns into a sorted list of EPUB paths."""
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, "**", "*.epub"), recursive=True))
+        else:
+            paths.extend(glob.glob(pattern, recursive=True))
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in paths if p.lower().endswith(".epub")))
+
+
+class BatchRunner:
+    """
+    Processes books on a pool of worker threads, one SpeechIndexer per book.
+    All API clients share one semaphore, so --max-requests is a global limit
+    across books. Speaker groups are resolved headless, from a fresh
+    AliasStore per book unless alias_file names a file shared by all books
+    (e.g. the books of one series).
+    """
+
+    def __init__(self, output_dir, provider="openai", chunk_size=2000, workers=2,
+                 max_requests=4, alias_file=None, chapter_workers=1, routing_threshold=None,
+                 streaming=False, candidates=10, spill_chunks=False):
+        self.output_dir = output_dir
+        self.provider = provider
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.chapter_workers = chapter_workers
+        # None disables the model routing
+        self.routing_threshold = routing_threshold
+        self.streaming = streaming
+        # candidate names per chunk in the prompt, 0 leaves them out
+        self.candidates = candidates
+        # keep raw and processed chunks in a file next to the output instead of in memory
+        self.spill_chunks = spill_chunks
+        self.request_limiter = threading.BoundedSemaphore(max_requests)
+        self.alias_file = alias_file
+        self.alias_store = AliasStore.load(alias_file) if alias_file else None
+        self._alias_lock = threading.Lock()
+
+    def run(self, paths):
+        """Returns one summary dict per book, in input order."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        summaries = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.process_book, path): path for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    summaries[path] = future.result()
+                except Exception as err:
+                    print(f"[BatchRunner] {os.path.basename(path)} failed: {err}")
+                    summaries[path] = {"book": os.path.basename(path), "status": f"failed: {err}"}
+
+        return [summaries[path] for path in paths]
+
+    def process_book(self, path, output_path=None, on_progress=None):
+        """
+        Annotates one book, by default into output_dir under the same name.
+        on_progress(done, total) is called after every chunk.
+        """
+        start = time.perf_counter()
+        if output_path is None:
+            output_path = os.path.join(self.output_dir, os.path.basename(path))
+
+        book = epub.read_epub(path)
+        parser = EpubParser(chunk_size=self.chunk_size)
+        chunk_store = None
+        try:
+            if self.spill_chunks:
+                chunk_store = ChunkStore(os.path.splitext(output_path)[0] + ".chunks", truncate=True)
+                chunks = chunk_store.chunks("raw")
+                chunks.extend(parser.iter_chunks(book))
+                processed_chunks = chunk_store.chunks("processed")
+            else:
+                chunks = parser.parse(book)
+                processed_chunks = []
+            candidate_index = CandidateIndex(limit=self.candidates).build(chunks) if self.candidates else None
+
+            indexer_options = {"model_routing": self.routing_threshold is not None,
+                               "routing_threshold": self.routing_threshold or 0, "streaming": self.streaming,
+                               "candidate_index": candidate_index}
+            indexer = SpeechIndexer(self.provider, request_limiter=self.request_limiter, **indexer_options)
+            if self.chapter_workers > 1:
+                indexers = index_chunks_by_item(
+                    lambda: SpeechIndexer(self.provider, speaker_registry=indexer.speaker_registry,
+                                          request_limiter=self.request_limiter, context_scope="item",
+                                          **indexer_options),
+                    chunks, processed_chunks, workers=self.chapter_workers, on_progress=on_progress,
+                )
+            else:
+                indexers = [indexer]
+                index_chunks(indexer, chunks, processed_chunks, on_progress=on_progress)
+            indexer.speaker_registry.save(os.path.splitext(output_path)[0] + ".speakers.json")
+            if self.routing_threshold is not None:
+                save_chunk_tiers(indexers, os.path.splitext(output_path)[0] + ".tiers.json")
+
+            usage = {}
+            for used in indexers:
+                for key, value in used.api_client.usage.to_dict().items():
+                    usage[key] = usage.get(key, 0) + value
+                if used.router is not None:
+                    for tier in ("cheap", "strong"):
+                        key = f"{tier}_calls"
+                        usage[key] = usage.get(key, 0) + used.router.report()[tier]["calls"]
+            if self.streaming:
+                first = [m["first_attribution_s"] for used in indexers for m in used.stream_metrics
+                         if m["first_attribution_s"] is not None]
+                usage["first_attribution_s"] = round(sum(first) / len(first), 3) if first else None
+
+            if self.alias_store is None:
+                final_mapping = AliasStore().resolve(indexer.speaker_registry, headless=True)
+            else:
+                with self._alias_lock:
+                    final_mapping = self.alias_store.resolve(indexer.speaker_registry, headless=True)
+                    self.alias_store.save(self.alias_file)
+
+            reparser = Reparser(book, processed_chunks, final_mapping=final_mapping)
+            reparser.save(output_path)
+            if chunk_store is not None:
+                usage["chunk_store_mb"] = round(chunk_store.size() / 2**20, 1)
+        finally:
+            # also for failed books, no open handle or stray .chunks file is left behind
+            if chunk_store is not None:
+                chunk_store.close(remove=True)
+        # of the whole process, so with several workers it covers all books processed so far
+        usage["peak_rss_mb"] = peak_rss_mb()
+
+        return {
+            "book": os.path.basename(path),
+            "status": "ok",
+            "chunks": len(chunks),
+            "speakers": len(indexer.speaker_registry),
+            "seconds": round(time.perf_counter() - start, 1),
+            **usage,
+        }
+
+
+def print_summary(summaries):
+    columns = ["book", "status", "chunks", "speakers", "seconds", "calls", "prompt_tokens", "completion_tokens"]
+    if any("cheap_calls" in s for s in summaries):
+        columns += ["cheap_calls", "strong_calls"]
+    if any("first_attribution_s" in s for s in summaries):
+        columns.append("first_attribution_s")
+    if any("chunk_store_mb" in s for s in summaries):
+        columns.append("chunk_store_mb")
+    columns.append("peak_rss_mb")
+    widths = {c: max([len(c)] + [len(str(s.get(c, ""))) for s in summaries]) for c in columns}
+    print("  ".join(f"{c:<{widths[c]}}" for c in columns))
+    for summary in summaries:
+        print("  ".join(f"{str(summary.get(c, '')):<{widths[c]}}" for c in columns))
+
+    ok = [s for s in summaries if s["status"] == "ok"]
+    print(
+        f"{len(ok)}/{len(summaries)} books, "
+        f"{sum(s['calls'] for s in ok)} calls, "
+        f"{sum(s['prompt_tokens'] + s['completion_tokens'] for s in ok)} tokens"
+    )
+
+
+def print_estimate(estimate):
+    columns = ["book", "chunks", "segments", "calls", "prompt_tokens", "completion_tokens", "dollars", "wall_seconds"]
+    rows = [{**book, "book": os.path.basename(book["book"])} for book in estimate["books"]]
+    rows.append({**estimate["total"], "book": "total"})
+    widths = {c: max([len(c)] + [len(str(r.get(c, ""))) for r in rows]) for c in columns}
+    print("  ".join(f"{c:<{widths[c]}}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{str(row.get(c, '')):<{widths[c]}}" for c in columns))
+    if estimate["total"]["over_context"]:
+        print(f"{estimate['total']['over_context']} chunks exceed the context window of their model.")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Annotate the speakers of many EPUB files.")
+    arg_parser.add_argument("inputs", nargs="+", help="EPUB files, directories or glob patterns")
+    arg_parser.add_argument("-o", "--output-dir", default="output", help="directory for the annotated EPUBs")
+    arg_parser.add_argument("-p", "--provider", choices=["openai", "deepseek", "offline"], default="openai")
+    arg_parser.add_argument("-c", "--chunk-size", type=int, default=2000, help="characters per chunk")
+    arg_parser.add_argument("-w", "--workers", type=int, default=2, help="books processed at the same time")
+    arg_parser.add_argument("-r", "--max-requests", type=int, default=4,
+                            help="concurrent API requests across all books")
+    arg_parser.add_argument("-a", "--aliases", default=None,
+                            help="alias file shared by all books (only for one series), applied and updated "
+                                 "headless; by default every book is grouped on its own")
+    arg_parser.add_argument("--chapter-workers", type=int, default=1,
+                            help="chapters of one book processed in parallel, each with its own context")
+    arg_parser.add_argument("--routing-threshold", type=float, default=None,
+                            help="route chunks with a higher difficulty score to the strong model")
+    arg_parser.add_argument("--candidates", type=int, default=10,
+                            help="candidate speaker names per chunk found locally and added to the prompt, 0 for none")
+    arg_parser.add_argument("--spill-chunks", action="store_true",
+                            help="keep the chunks on disk instead of in memory, for very large books")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="stream the speaker answers and apply each speaker as soon as it arrives")
+    dry_run = arg_parser.add_argument_group("dry run", "estimate a run without sending any request")
+    dry_run.add_argument("--dry-run", action="store_true",
+                         help="only parse and tag locally, print the projected calls, tokens, cost and wall time")
+    dry_run.add_argument("--estimate-file", default=None, help="write the estimate with all chunks as JSON")
+    dry_run.add_argument("--rpm", type=float, default=None, help="rate limit, requests per minute")
+    dry_run.add_argument("--tpm", type=float, default=None, help="rate limit, tokens per minute")
+    dry_run.add_argument("--latency", type=float, default=1.0, help="seconds per request before the answer")
+    dry_run.add_argument("--tokens-per-s", type=float, default=50.0, help="generated tokens per second")
+    dry_run.add_argument("--prices", default=None,
+                         help='JSON file {"model": [prompt, completion]} in US$ per million tokens')
+    args = arg_parser.parse_args(argv)
+
+    paths = collect_epubs(args.inputs)
+    if not paths:
+        print("No EPUB files found.")
+        return 1
+
+    if args.dry_run:
+        prices = None
+        if args.prices:
+            with open(args.prices, encoding="utf-8") as f:
+                prices = {model: tuple(price) for model, price in json.load(f).items()}
+        estimator = DryRunEstimator(
+            provider=args.provider, chunk_size=args.chunk_size, workers=args.workers,
+            chapter_workers=args.chapter_workers, max_requests=args.max_requests,
+            routing_threshold=args.routing_threshold, rpm=args.rpm, tpm=args.tpm,
+            latency=args.latency, tokens_per_s=args.tokens_per_s, prices=prices, candidates=args.candidates,
+        )
+        estimate = estimator.estimate(paths)
+        print_estimate(estimate)
+        if args.estimate_file:
+            with open(args.estimate_file, "w", encoding="utf-8") as f:
+                json.dump(estimate, f, indent=2)
+        return 0
+
+    runner = BatchRunner(args.output_dir, provider=args.provider, chunk_size=args.chunk_size,
+                         workers=args.workers, max_requests=args.max_requests, alias_file=args.aliases,
+                         chapter_workers=args.chapter_workers, routing_threshold=args.routing_threshold,
+                         streaming=args.stream, candidates=args.candidates, spill_chunks=args.spill_chunks)
+    summaries = runner.run(paths)
+    print_summary(summaries)
+    return 0 if all(s["status"] == "ok" for s in summaries) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,9 +9,12 @@ class EpubParser:
         self.chunk_size = chunk_size
 
     def parse(self, book):
+        return list(self.iter_chunks(book))
+
+    # yields the chunks item by item, e.g. straight into a ChunkStore for very large books
+    def iter_chunks(self, book):
         content_items = book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
-        chunks = []
-        
+
         for item_index, item in enumerate(content_items):
             content = item.get_content().decode('utf-8')
             soup = BeautifulSoup(content, 'html.parser')
@@ -30,7 +33,7 @@ class EpubParser:
                 element_str = str(element)
                 if len(current_chunk) + len(element_str) > self.chunk_size:
                     if current_chunk:
-                        chunks.append(Chunk(f"{item_index}.{chunk_index}", current_chunk.strip()))
+                        yield Chunk(f"{item_index}.{chunk_index}", current_chunk.strip())
                         chunk_index += 1
                     current_chunk = element_str
                 else:
@@ -38,6 +41,4 @@ class EpubParser:
 
             # Append the last chunk of the item
             if current_chunk:
-                chunks.append(Chunk(f"{item_index}.{chunk_index}", current_chunk.strip()))
-
-        return chunks
+                yield Chunk(f"{item_index}.{chunk_index}", current_chunk.strip())
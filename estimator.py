@@ -0,0 +1,237 @@
+import heapq
+import json
+import math
+import re
+import time
+from ebooklib import epub
+
+from api import ApiUsage, OpenAIClient, DeepSeekClient
+from epub_book_parser import EpubParser
+from indexer import SpeechIndexer
+from all_speakers import SpeakerRegistry
+from candidate_names import CandidateIndex
+
+try:
+    import tiktoken
+except ImportError:  # optional, without it tokens are estimated from the characters
+    tiktoken = None
+
+# dry run of the pipeline: parsing and tagging run locally, the speaker requests are only built
+# (with the exact prompts of the API clients) and counted, nothing is sent. Entry point: cli.py --dry-run
+
+PROVIDERS = {"openai": OpenAIClient, "deepseek": DeepSeekClient}
+
+# US$ per million prompt / completion tokens, check the current price lists before relying on them
+DEFAULT_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+}
+
+# prompt tokens a model accepts, longer requests would fail in a real run
+CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "deepseek-chat": 64_000,
+    "deepseek-reasoner": 64_000,
+}
+
+
+def count_tokens(text: str) -> int:
+    if tiktoken is not None:
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    # a few tokens of framing per message and for the reply
+    return sum(count_tokens(msg["content"]) + 3 for msg in messages) + 3
+
+
+class EstimatingClient:
+    """
+    Stands in for OpenAIClient/DeepSeekClient: builds the same speaker
+    requests, counts their tokens and answers "Unknown" for every segment, so
+    the indexer takes its usual path. Reasoning tokens of reasoning models are
+    not included in the completion estimate.
+    """
+
+    def __init__(self, provider="openai"):
+        if provider not in PROVIDERS:
+            raise ValueError(f"No estimate for provider {provider!r}, use one of {', '.join(PROVIDERS)}.")
+        self.provider = PROVIDERS[provider]
+        self.MODELS = self.provider.MODELS
+        self.usage = ApiUsage()
+        # one entry per request: {"model", "prompt_tokens", "completion_tokens"}
+        self.calls: list[dict] = []
+
+    def get_speakers(self, conversation_history, model=None):
+        request = self.provider._speakers_request(conversation_history, model)
+        answer = self._answer(conversation_history)
+        prompt_tokens = count_message_tokens(request["messages"])
+        completion_tokens = count_tokens(answer)
+        self.calls.append({
+            "model": request["model"],
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        })
+        self.usage.record(prompt_tokens, completion_tokens)
+        return answer
+
+    def stream_speakers(self, conversation_history, model=None):
+        yield self.get_speakers(conversation_history, model)
+
+    @staticmethod
+    def _answer(conversation_history) -> str:
+        user_content = next(
+            (msg["content"] for msg in reversed(conversation_history) if msg["role"] == "user"), ""
+        )
+        answer = {
+            category: {idx: "Unknown" for idx in re.findall(fr'<{tag} index="(\d+)">', user_content)}
+            for category, tag in (("speech", "speech"), ("thought", "em"))
+        }
+        return json.dumps(answer, indent=2)
+
+
+class DryRunEstimator:
+    """
+    Projects calls, tokens, dollars and wall time of a run.
+
+    Wall time: every request takes latency + completion_tokens / tokens_per_s
+    seconds. Requests of one rolling context (a book, or a chapter with
+    chapter_workers > 1) run one after another, contexts run side by side on
+    min(max_requests, workers * chapter_workers) slots. rpm/tpm (requests and
+    tokens per minute) put a lower bound on the total.
+    """
+
+    def __init__(self, provider="openai", chunk_size=2000, workers=1, chapter_workers=1, max_requests=4,
+                 routing_threshold=None, rpm=None, tpm=None, latency=1.0, tokens_per_s=50.0, prices=None,
+                 candidates=10):
+        self.provider = provider
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.chapter_workers = chapter_workers
+        self.max_requests = max_requests
+        self.routing_threshold = routing_threshold
+        self.rpm = rpm
+        self.tpm = tpm
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s
+        self.prices = dict(DEFAULT_PRICES)
+        self.prices.update(prices or {})
+        self.candidates = candidates
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- public interface ------------------------- #
+    # --------------------------------------------------------------------- #
+    def estimate(self, paths) -> dict:
+        """{"books": [per book estimate], "total": {...}}, see estimate_book for the keys."""
+        books = [self.estimate_book(path) for path in paths]
+        streams = [seconds for book in books for seconds in book["stream_seconds"].values()]
+        total = self._totals([chunk for book in books for chunk in book["per_chunk"]])
+        total["local_seconds"] = round(sum(book["local_seconds"] for book in books), 2)
+        total["wall_seconds"] = self._wall_seconds(
+            streams, total["calls"], total["prompt_tokens"] + total["completion_tokens"]
+        )
+        return {"books": books, "total": total}
+
+    def estimate_book(self, path) -> dict:
+        """
+        Parses and tags one book locally. Returns the book totals and per_chunk the
+        segments, model, tokens and seconds of its requests.
+        """
+        start = time.perf_counter()
+        chunks = EpubParser(chunk_size=self.chunk_size).parse(epub.read_epub(path))
+
+        client = EstimatingClient(self.provider)
+        candidate_index = CandidateIndex(limit=self.candidates).build(chunks) if self.candidates else None
+        indexer_options = {"model_routing": self.routing_threshold is not None,
+                           "routing_threshold": self.routing_threshold or 0, "candidate_index": candidate_index}
+        registry = SpeakerRegistry()
+        # like index_chunks_by_item, every chapter gets its own rolling context with chapter_workers > 1
+        per_item = self.chapter_workers > 1
+        indexers = {}
+
+        rows = []
+        for chunk in chunks:
+            stream = chunk.get_index().split(".")[0] if per_item else "book"
+            if stream not in indexers:
+                indexers[stream] = SpeechIndexer(
+                    client, speaker_registry=registry, context_scope="item" if per_item else "book",
+                    **indexer_options,
+                )
+            calls_before = len(client.calls)
+            processed = indexers[stream].process_chunk(chunk)
+            content = processed.get_content()
+
+            row = {
+                "chunk": chunk.get_index(),
+                "stream": stream,
+                "speech": len(re.findall(r"<speech speaker=", content)),
+                "thought": len(re.findall(r"<em speaker=", content)),
+                "model": None,
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "seconds": 0.0,
+                "dollars": 0.0,
+                "over_context": False,
+            }
+            for call in client.calls[calls_before:]:
+                row["calls"] += 1
+                row["model"] = call["model"]
+                row["prompt_tokens"] += call["prompt_tokens"]
+                row["completion_tokens"] += call["completion_tokens"]
+                row["seconds"] += self._call_seconds(call["completion_tokens"])
+                row["dollars"] += self._dollars(call)
+                row["over_context"] |= call["prompt_tokens"] > CONTEXT_WINDOWS.get(call["model"], math.inf)
+            rows.append(row)
+
+        # projected request seconds per rolling context
+        streams = {}
+        for row in rows:
+            streams[row["stream"]] = streams.get(row["stream"], 0.0) + row["seconds"]
+
+        book = {"book": path, **self._totals(rows)}
+        book["local_seconds"] = round(time.perf_counter() - start, 2)
+        book["wall_seconds"] = self._wall_seconds(
+            list(streams.values()), book["calls"], book["prompt_tokens"] + book["completion_tokens"]
+        )
+        book["stream_seconds"] = streams
+        book["per_chunk"] = rows
+        return book
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- helpers ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def _call_seconds(self, completion_tokens):
+        return self.latency + completion_tokens / self.tokens_per_s
+
+    def _dollars(self, call):
+        prompt_price, completion_price = self.prices.get(call["model"], (0.0, 0.0))
+        return (call["prompt_tokens"] * prompt_price + call["completion_tokens"] * completion_price) / 1e6
+
+    def _wall_seconds(self, streams, calls, tokens):
+        slots = [0.0] * max(1, min(self.max_requests, self.workers * self.chapter_workers))
+        # longest context first onto the slot that is free first
+        for seconds in sorted(streams, reverse=True):
+            heapq.heappush(slots, heapq.heappop(slots) + seconds)
+        wall = max(slots)
+        if self.rpm:
+            wall = max(wall, calls / self.rpm * 60)
+        if self.tpm:
+            wall = max(wall, tokens / self.tpm * 60)
+        return round(wall, 1)
+
+    @staticmethod
+    def _totals(rows):
+        return {
+            "chunks": len(rows),
+            "segments": sum(row["speech"] + row["thought"] for row in rows),
+            "calls": sum(row["calls"] for row in rows),
+            "prompt_tokens": sum(row["prompt_tokens"] for row in rows),
+            "completion_tokens": sum(row["completion_tokens"] for row in rows),
+            "dollars": round(sum(row["dollars"] for row in rows), 4),
+            "over_context": sum(row["over_context"] for row in rows),
+        }
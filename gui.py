@@ -1,19 +1,68 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import json
-from all_speakers import AllSpeakers
+import queue
+import re
+from bisect import bisect_left
+from all_speakers import SpeakerRegistry
+
+class PrefixIndex:
+    """Sorted (token, name) pairs, so every name with a word starting with a prefix is found by bisection"""
+    def __init__(self, names=()):
+        self.entries = sorted({(token, name) for name in names for token in self.tokens(name)})
+    
+    @staticmethod
+    def tokens(name):
+        folded = name.casefold()
+        return {folded, *re.findall(r"\w+", folded)}
+    
+    def add(self, name):
+        for token in self.tokens(name):
+            entry = (token, name)
+            i = bisect_left(self.entries, entry)
+            if i == len(self.entries) or self.entries[i] != entry:
+                self.entries.insert(i, entry)
+    
+    def search(self, query):
+        """Names matching every word of the query as a prefix"""
+        result = None
+        for word in re.findall(r"\w+", query.casefold()) or [query.casefold()]:
+            matches = set()
+            i = bisect_left(self.entries, (word,))
+            while i < len(self.entries) and self.entries[i][0].startswith(word):
+                matches.add(self.entries[i][1])
+                i += 1
+            result = matches if result is None else result & matches
+        return result
 
 class SpeakerAliasUI:
-    def __init__(self, root):
+    def __init__(self, root, speaker_registry: SpeakerRegistry, suggested_groups=None, alias_store=None):
         self.root = root
         self.root.title("Speaker Alias Manager")
         self.root.geometry("800x600")
         
-        self.speakers = AllSpeakers.all_speakers
+        self.speaker_registry = speaker_registry
+        self.speakers = speaker_registry.names()
+        self.known_speakers = set(self.speakers)
+        self.alias_store = alias_store  # stored groups are applied to speakers streamed in later
+        self.speaker_counts = speaker_registry.counts()
         self.speaker_groups = {}  # Dictionary to store speaker groupings
+        self.grouped_speakers = set()  # all speakers that are part of a group
         self.current_group_id = 1
         
+        # the rows of the listbox in display order, with their sort keys for bisection
+        self.visible_speakers = []
+        self.visible_keys = []
+        self.prefix_index = PrefixIndex(self.speakers)
+        self._filter_job = None
+        
         self.create_ui()
+        # Preload proposed groups (e.g. from AliasClusterer) so they only need to be reviewed
+        if suggested_groups:
+            self.load_groups(suggested_groups)
+        if alias_store is not None:
+            for group_name, aliases in alias_store.apply(self.speakers).items():
+                self.add_to_group(group_name, aliases)
         # Call this method to populate the speakers list initially
         self.update_speaker_list()
     
@@ -35,6 +84,21 @@ class SpeakerAliasUI:
         left_frame = ttk.LabelFrame(main_frame, text="Available Speakers")
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Search box and sort order above the list
+        filter_frame = ttk.Frame(left_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_filter_change)
+        ttk.Entry(filter_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        self.sort_var = tk.StringVar(value="Name")
+        sort_box = ttk.Combobox(filter_frame, textvariable=self.sort_var, values=("Name", "Occurrences"),
+                                state="readonly", width=12)
+        sort_box.pack(side=tk.RIGHT)
+        sort_box.bind("<<ComboboxSelected>>", lambda event: self.update_speaker_list())
+        
         # Create a frame to hold the listbox and scrollbar
         list_frame = ttk.Frame(left_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
@@ -77,21 +141,113 @@ class SpeakerAliasUI:
         
         # Double-click to rename
         self.groups_tree.bind("<Double-1>", lambda event: self.rename_group())
-        print(self.speakers)
-        print(AllSpeakers.all_speakers)
     
     def update_speaker_list(self):
+        """Rebuilds the whole list, only needed when the filter or the sort order changes"""
         self.speaker_listbox.delete(0, tk.END)
+        self.speaker_counts = self.speaker_registry.counts()
+        
+        self.visible_speakers = sorted(
+            (speaker for speaker in self.filtered_speakers() if speaker not in self.grouped_speakers),
+            key=self.sort_key,
+        )
+        self.visible_keys = [self.sort_key(speaker) for speaker in self.visible_speakers]
+        if self.visible_speakers:
+            self.speaker_listbox.insert(tk.END, *self.visible_speakers)
+    
+    def filtered_speakers(self):
+        query = self.search_var.get().strip()
+        if not query:
+            return self.speakers
+        return self.prefix_index.search(query)
+    
+    def sort_key(self, speaker):
+        if self.sort_var.get() == "Occurrences":
+            return (-self.speaker_counts.get(speaker, 0), speaker.casefold(), speaker)
+        return (speaker.casefold(), speaker)
+    
+    def on_filter_change(self, *args):
+        # wait for a short typing pause before filtering
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(150, self._apply_filter)
+    
+    def _apply_filter(self):
+        self._filter_job = None
+        self.update_speaker_list()
+    
+    def insert_speakers(self, speakers):
+        """Inserts only the given speakers at their sorted position"""
+        query = self.search_var.get().strip()
+        matches = self.prefix_index.search(query) if query else None
+        for speaker in speakers:
+            if speaker in self.grouped_speakers or (matches is not None and speaker not in matches):
+                continue
+            key = self.sort_key(speaker)
+            i = bisect_left(self.visible_keys, key)
+            if i < len(self.visible_keys) and self.visible_keys[i] == key:
+                continue  # already shown
+            self.visible_keys.insert(i, key)
+            self.visible_speakers.insert(i, speaker)
+            self.speaker_listbox.insert(i, speaker)
+    
+    def remove_rows(self, indices):
+        """Removes the given listbox rows, highest first so the other indices stay valid"""
+        for i in sorted(indices, reverse=True):
+            self.speaker_listbox.delete(i)
+            del self.visible_speakers[i]
+            del self.visible_keys[i]
+    
+    def remove_speakers(self, speakers):
+        rows = []
+        for speaker in speakers:
+            key = self.sort_key(speaker)
+            i = bisect_left(self.visible_keys, key)
+            if i < len(self.visible_keys) and self.visible_keys[i] == key:
+                rows.append(i)
+        self.remove_rows(rows)
+    
+    def add_speakers(self, speakers):
+        """Adds newly detected speakers, e.g. while the indexer is still running"""
+        new_speakers = [speaker for speaker in dict.fromkeys(speakers) if speaker not in self.known_speakers]
+        if not new_speakers:
+            return
+        counts = self.speaker_registry.counts()
+        for speaker in new_speakers:
+            self.speaker_counts[speaker] = counts.get(speaker, 0)
+            self.prefix_index.add(speaker)
+        self.speakers.extend(new_speakers)
+        self.known_speakers.update(new_speakers)
         
-        # Get all speakers already in groups
-        grouped_speakers = []
-        for speakers in self.speaker_groups.values():
-            grouped_speakers.extend(speakers)
+        if self.alias_store is not None:
+            for group_name, aliases in self.alias_store.apply(new_speakers).items():
+                self.add_to_group(group_name, aliases)
+        self.insert_speakers(new_speakers)
+    
+    def poll_speaker_queue(self, speaker_queue, interval=200):
+        """
+        Takes speaker names from a queue filled by another thread and adds them
+        to the list. Tk may only be used from its own thread, so the queue is
+        polled with root.after. A None item marks the end of the indexing.
+        """
+        new_speakers = []
+        finished = False
+        while True:
+            try:
+                item = speaker_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                finished = True
+                break
+            new_speakers.extend(item)
         
-        # Add speakers not in any group to the listbox
-        for speaker in self.speakers:
-            if speaker not in grouped_speakers:
-                self.speaker_listbox.insert(tk.END, speaker)
+        self.add_speakers(new_speakers)
+        if finished:
+            self.root.title("Speaker Alias Manager (indexing finished)")
+        else:
+            self.root.title("Speaker Alias Manager (indexing...)")
+            self.root.after(interval, self.poll_speaker_queue, speaker_queue, interval)
     
     def create_group(self):
         selected_indices = self.speaker_listbox.curselection()
@@ -100,7 +256,7 @@ class SpeakerAliasUI:
             messagebox.showwarning("Warning", "No speakers selected")
             return
             
-        selected_speakers = [self.speaker_listbox.get(i) for i in selected_indices]
+        selected_speakers = [self.visible_speakers[i] for i in selected_indices]
         
         # Ask for a group name instead of auto-generating one
         group_name = simpledialog.askstring("Create Group", "Enter a name for the new group:", 
@@ -109,7 +265,12 @@ class SpeakerAliasUI:
         if not group_name:  # User cancelled
             return
             
+        if group_name in self.speaker_groups:
+            messagebox.showerror("Error", f"A group named '{group_name}' already exists!")
+            return
+            
         self.speaker_groups[group_name] = selected_speakers
+        self.grouped_speakers.update(selected_speakers)
         self.current_group_id += 1
         
         # Update tree view
@@ -117,7 +278,33 @@ class SpeakerAliasUI:
         self.groups_tree.insert("", "end", text=group_name, values=(aliases_str,))
         
         # Update available speakers
-        self.update_speaker_list()
+        self.remove_rows(selected_indices)
+    
+    def load_groups(self, groups):
+        """Adds the given {group_name: [aliases]} to the groups view"""
+        for group_name, aliases in groups.items():
+            # a speaker can only be part of one group
+            aliases = [alias for alias in aliases if alias not in self.grouped_speakers]
+            if group_name in self.speaker_groups or not aliases:
+                continue
+            self.speaker_groups[group_name] = aliases
+            self.grouped_speakers.update(aliases)
+            self.groups_tree.insert("", "end", text=group_name, values=(", ".join(aliases),))
+            self.remove_speakers(aliases)
+    
+    def add_to_group(self, group_name, aliases):
+        """Adds aliases to a group, creating it if needed"""
+        if group_name not in self.speaker_groups:
+            self.load_groups({group_name: aliases})
+            return
+        aliases = [alias for alias in aliases if alias not in self.grouped_speakers]
+        self.speaker_groups[group_name].extend(aliases)
+        self.grouped_speakers.update(aliases)
+        for item in self.groups_tree.get_children():
+            if self.groups_tree.item(item, "text") == group_name:
+                self.groups_tree.item(item, values=(", ".join(self.speaker_groups[group_name]),))
+                break
+        self.remove_speakers(aliases)
     
     def show_context_menu(self, event):
         item = self.groups_tree.identify_row(event.y)
@@ -161,13 +348,14 @@ class SpeakerAliasUI:
         
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete group '{group_name}'?"):
             # Remove from dictionary
-            del self.speaker_groups[group_name]
+            released = self.speaker_groups.pop(group_name)
+            self.grouped_speakers.difference_update(released)
             
             # Remove from tree
             self.groups_tree.delete(item)
             
             # Update available speakers
-            self.update_speaker_list()
+            self.insert_speakers(released)
     
     def save_groupings(self):
         """Return the speaker groups dictionary"""
@@ -1,23 +1,65 @@
 # indexer.py
 import json
 import re
+import time
 from bs4 import BeautifulSoup
 from bs4.element import NavigableString  
 
-from api import OpenAIClient, DeepSeekClient
+from api import OpenAIClient, DeepSeekClient, OfflineClient
 from item_chunk import Chunk
-from all_speakers import AllSpeakers
+from all_speakers import SpeakerRegistry
+from model_router import ModelRouter
+from stream_parser import IncrementalSpeakerParser
+from candidate_names import CandidateIndex
 
 
 class SpeechIndexer:
-    def __init__(self, api_client="openai"):
+    def __init__(
+        self,
+        api_client="openai",
+        speaker_registry: SpeakerRegistry | None = None,
+        request_limiter=None,
+        context_scope="book",
+        roster_size=30,
+        model_routing=False,
+        routing_threshold=40.0,
+        streaming=False,
+        candidate_index: CandidateIndex | None = None,
+    ):
+        # request_limiter: shared semaphore capping concurrent API requests across indexers
+        # context_scope: "book" keeps one rolling context for the whole book, "item" starts a new one for
+        # every EPUB document item (chapter), seeded with the roster_size most frequent speakers so far,
+        # so that chapters can be processed in parallel by separate indexers
+        if context_scope not in ("book", "item"):
+            raise ValueError("Invalid context scope specified.")
+        self.context_scope = context_scope
+        self.roster_size = roster_size
+        self.current_item: str | None = None
         match api_client:
             case "openai":
-                self.api_client = OpenAIClient()
+                self.api_client = OpenAIClient(request_limiter)
             case "deepseek":
-                self.api_client = DeepSeekClient()
-            case _:
+                self.api_client = DeepSeekClient(request_limiter)
+            case "offline":
+                self.api_client = OfflineClient(request_limiter=request_limiter)
+            case str():
                 raise ValueError("Invalid API client specified.")
+            case _:
+                # an already constructed client, e.g. the EstimatingClient of a dry run
+                self.api_client = api_client
+
+        # model_routing: send hard chunks (and unparsable answers) to the strong model of the client
+        self.router = ModelRouter(self.api_client, threshold=routing_threshold) if model_routing else None
+        # per routed chunk: {"tier", "speech", "thought"} with the number of segments, so benchmark
+        # results can be split by the tier that answered (see save_chunk_tiers in pipeline.py)
+        self.chunk_tiers: dict[str, dict] = {}
+
+        # streaming: apply every attribution as soon as it arrives in the streamed answer,
+        # on_attribution(chunk, category, index, name) is called after each one
+        self.streaming = streaming
+        self.on_attribution = None
+        # per streamed chunk: {"chunk", "first_attribution_s", "total_s", "attributions"}
+        self.stream_metrics: list[dict] = []
 
         # base prompt
         self.base_message = {
@@ -29,7 +71,16 @@ class SpeechIndexer:
             ),
         }
 
+        # ranked candidate names per chunk, built over the whole book before indexing
+        self.candidate_index = candidate_index
+
+        # speakers detected during this run, may be shared between indexers
+        if speaker_registry is None:
+            speaker_registry = SpeakerRegistry()
+        self.speaker_registry = speaker_registry
+
         # initializes the messages array with the base prompt
+        self.context_seed: list[dict] = []
         self.messages = [self.base_message]
         self.blocks: list[list[dict]] = []
 
@@ -42,22 +93,23 @@ class SpeechIndexer:
         retrieves speaker names via LLM and replaces the index attributes
         by speaker attributes.
         """
+        if self.context_scope == "item":
+            item_index = chunk.get_index().split(".")[0]
+            if item_index != self.current_item:
+                self._start_item_context(item_index)
+
         current_block: list[dict] = []
         # ----------------------------------------------------------------- #
-        # 0. prescan for obvious speaker names, comment out for benchmarking
-        chunk_content = chunk.get_content()
-        """try:
-            prescan_summary = self.api_client.prescan(chunk_content)
-        except Exception as err:
-            prescan_summary = "n/a"
-            print(f"[Prescan] {err}")
-
-        prescan_msg = {
-            "role": "assistant",
-            "content": f"Occurring speakers in the text: {prescan_summary}",
-        }
-        self.messages.append(prescan_msg)
-        current_block.append(prescan_msg)"""
+        # 0. candidate speakers from the local name index, replaces the former prescan request
+        if self.candidate_index is not None:
+            candidates = self.candidate_index.candidates(chunk.get_index())
+            if candidates:
+                candidates_msg = {
+                    "role": "assistant",
+                    "content": f"Candidate speakers in the text, most likely first: {', '.join(candidates)}",
+                }
+                self.messages.append(candidates_msg)
+                current_block.append(candidates_msg)
         # ----------------------------------------------------------------- #
         # 1. tag speech & thoughts
         tagged_chunk = self._find_and_tag_speech_and_thoughts(chunk)
@@ -87,7 +139,15 @@ class SpeechIndexer:
 
         # ----------------------------------------------------------------- #
         # 3. parse model response
-        speakers_response = self.api_client.get_speakers(self.messages)
+        if self.streaming:
+            return self._stream_speakers(tagged_chunk, current_block, speech_indexes, thought_indexes)
+        if self.router is not None:
+            speakers_response = self.router.get_speakers(
+                self.messages, tagged_text, lambda r: self._check_answer(r, speech_indexes, thought_indexes)
+            )
+            self._record_tier(chunk.get_index(), speech_indexes, thought_indexes)
+        else:
+            speakers_response = self.api_client.get_speakers(self.messages)
         try:
             cleaned_response = self._extract_json(speakers_response)
             speakers_dict = json.loads(cleaned_response)
@@ -97,8 +157,8 @@ class SpeechIndexer:
             speakers_dict.setdefault("thought", {})
 
             self._validate_speaker_names(speakers_dict)
-            AllSpeakers.enrich_speaker_set(speakers_dict["speech"].values())
-            AllSpeakers.enrich_speaker_set(speakers_dict["thought"].values())
+            self.speaker_registry.add(speakers_dict["speech"].values(), chunk.get_index())
+            self.speaker_registry.add(speakers_dict["thought"].values(), chunk.get_index())
 
             processed_chunk = self._replace_all_indexes(
                 tagged_chunk, speakers_dict, speech_indexes, thought_indexes
@@ -131,6 +191,77 @@ class SpeechIndexer:
             self._update_messages()
             return tagged_chunk
 
+    # --------------------------------------------------------------------- #
+    # ---------------- streamed speaker answers --------------------------- #
+    # --------------------------------------------------------------------- #
+    def _stream_speakers(
+        self, tagged_chunk: Chunk, current_block, speech_indexes, thought_indexes
+    ) -> Chunk:
+        """
+        Applies the speaker of each segment while the answer is still being
+        generated. Segments the complete answer has no speaker for become
+        "Unknown", an incomplete answer leaves them untouched.
+        """
+        tags = {"speech": "speech", "thought": "em"}
+        speakers_dict = {"speech": {}, "thought": {}}
+        parser = IncrementalSpeakerParser()
+        metric = {"chunk": tagged_chunk.get_index(), "first_attribution_s": None, "attributions": 0}
+        text = tagged_chunk.get_content()
+        pieces = []
+
+        start = time.perf_counter()
+        if self.router is not None:
+            stream = self.router.stream_speakers(
+                self.messages, text, lambda r: self._check_answer(r, speech_indexes, thought_indexes)
+            )
+        else:
+            stream = self.api_client.stream_speakers(self.messages)
+        for piece in stream:
+            pieces.append(piece)
+            for category, idx, name in parser.feed(piece):
+                idx = int(idx) if idx.isdigit() else idx
+                marker = f'<{tags[category]} index="{idx}">'
+                if marker not in text:
+                    continue
+                name = self._clean_speaker_name(name)
+                text = text.replace(marker, f'<{tags[category]} speaker="{name}">')
+                tagged_chunk.set_content(text)
+                speakers_dict[category][idx] = name
+                self.speaker_registry.add([name], tagged_chunk.get_index())
+
+                if metric["first_attribution_s"] is None:
+                    metric["first_attribution_s"] = round(time.perf_counter() - start, 4)
+                metric["attributions"] += 1
+                if self.on_attribution is not None:
+                    self.on_attribution(tagged_chunk, category, idx, name)
+        metric["total_s"] = round(time.perf_counter() - start, 4)
+        self.stream_metrics.append(metric)
+        if self.router is not None:
+            self._record_tier(tagged_chunk.get_index(), speech_indexes, thought_indexes)
+
+        if not parser.finished:
+            print(f"[SpeechIndexer] incomplete streamed answer for chunk {tagged_chunk.get_index()}")
+            print(f"Model raw response:\n{''.join(pieces)}\n")
+            self.blocks.append(current_block)
+            self._update_messages()
+            return tagged_chunk
+
+        return self._replace_all_indexes(tagged_chunk, speakers_dict, speech_indexes, thought_indexes)
+
+    def stream_report(self) -> dict:
+        """Averages of the stream metrics, time to first attribution vs. the complete answer."""
+        return self.summarise_stream_metrics(self.stream_metrics)
+
+    @staticmethod
+    def summarise_stream_metrics(stream_metrics: list[dict]) -> dict:
+        first = [m["first_attribution_s"] for m in stream_metrics if m["first_attribution_s"] is not None]
+        total = [m["total_s"] for m in stream_metrics]
+        return {
+            "chunks": len(stream_metrics),
+            "avg_first_attribution_s": round(sum(first) / len(first), 4) if first else None,
+            "avg_total_s": round(sum(total) / len(total), 4) if total else None,
+        }
+
     # --------------------------------------------------------------------- #
     # ---------------- tagging speech & thoughts -------------------------- #
     # --------------------------------------------------------------------- #
@@ -274,11 +405,27 @@ class SpeechIndexer:
     def _update_messages(self) -> None:
         """Keep only the last 5 blocks for the next API call."""
         recent_blocks = self.blocks[-5:]
-        # base_message always first, then flatten the last blocks
-        self.messages = [self.base_message] + [
+        # base_message always first, then the seed of the context and the flattened last blocks
+        self.messages = [self.base_message] + self.context_seed + [
             msg for block in recent_blocks for msg in block
         ]
 
+    def _start_item_context(self, item_index: str) -> None:
+        """Drops the rolling context and seeds a new one with the known speakers."""
+        self.current_item = item_index
+        self.blocks = []
+        roster = [
+            name for name, _ in self.speaker_registry.most_common(self.roster_size + 1)
+            if name != "Unknown"
+        ][: self.roster_size]
+        self.context_seed = []
+        if roster:
+            self.context_seed.append({
+                "role": "assistant",
+                "content": f"Known speakers in the book so far: {', '.join(roster)}",
+            })
+        self._update_messages()
+
     # ---------------- utilities ---------------- #
     def _get_visible_text_nodes(self, soup: BeautifulSoup) -> list:
         """
@@ -301,6 +448,35 @@ class SpeechIndexer:
             return response[start : end + 1]
         return '{"speech": {}, "thought": {}}'
 
+    def _record_tier(self, chunk_index: str, speech_indexes, thought_indexes) -> None:
+        self.chunk_tiers[chunk_index] = {
+            "tier": self.router.last_tier,
+            "speech": len(speech_indexes),
+            "thought": len(thought_indexes),
+        }
+
+    def _check_answer(self, response: str, speech_indexes, thought_indexes) -> dict:
+        """
+        Parses a speakers answer for the model router. Raises ValueError if the
+        answer holds no JSON object (refusals, prose) or misses one of the
+        requested indexes, so the router can retry it on the strong model.
+        """
+        start = response.find("{")
+        end = response.rfind("}")
+        if start == -1 or end <= start:
+            raise ValueError("no JSON object in the answer")
+        speakers_dict = json.loads(response[start : end + 1])
+        if not isinstance(speakers_dict, dict):
+            raise ValueError("the answer is no JSON object")
+        for category, indexes in (("speech", speech_indexes), ("thought", thought_indexes)):
+            answered = speakers_dict.get(category) or {}
+            if not isinstance(answered, dict):
+                raise ValueError(f"{category} is no JSON object")
+            missing = [idx for idx in indexes if str(idx) not in answered]
+            if missing:
+                raise ValueError(f"no {category} speaker for indexes {missing}")
+        return speakers_dict
+
     def _validate_speaker_names(self, speakers_dict: dict) -> None:
         """
         • converts index strings to int
@@ -311,14 +487,16 @@ class SpeechIndexer:
             cleaned = {}
             for idx, name in speakers_dict[category].items():
                 numeric_idx = int(idx) if isinstance(idx, str) and idx.isdigit() else idx
-                if isinstance(name, str):
-                    name = re.sub(r'index=["\']\d+["\']', "", name)
-                    name = re.sub(r"<[^>]+>", "", name).strip('"\t\n ').strip()
-                if not name:
-                    name = "Unknown"
-                cleaned[numeric_idx] = name
+                cleaned[numeric_idx] = self._clean_speaker_name(name)
             speakers_dict[category] = cleaned
 
+    @staticmethod
+    def _clean_speaker_name(name):
+        if isinstance(name, str):
+            name = re.sub(r'index=["\']\d+["\']', "", name)
+            name = re.sub(r"<[^>]+>", "", name).strip('"\t\n ').strip()
+        return name or "Unknown"
+
     def _replace_all_indexes(
         self, chunk: Chunk, speakers_dict, speech_indexes, thought_indexes
     ) -> Chunk:
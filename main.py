@@ -1,9 +1,17 @@
+import queue
+import threading
 import tkinter as tk
 from ebooklib import epub
 from epub_book_parser import EpubParser
 from indexer import SpeechIndexer
+from model_router import ModelRouter
 from reparser import Reparser
+from alias_store import AliasStore
+from candidate_names import CandidateIndex
 from gui import SpeakerAliasUI
+from chunk_store import ChunkStore, peak_rss_mb
+from pipeline import index_chunks, index_chunks_by_item, save_chunk_tiers
+
 
 def main():
     
@@ -15,23 +23,94 @@ def main():
     epub_file_path = "path/to/your/book.epub"  # Replace with your EPUB file path
     book = epub.read_epub(epub_file_path)
     parser = EpubParser(chunk_size=2000)
-    chunks = parser.parse(book)
 
-    indexer = SpeechIndexer("openai")  # alternative: "deepseek"
-    processed_chunks = []
-    for i, chunk in enumerate(chunks):
-        processed_chunk = indexer.process_chunk(chunk)
-        processed_chunks.append(processed_chunk)
-        print(f"Processed Chunkgroup {processed_chunk.get_index()} Number {i+1}")
+    # for very large books (collected works, omnibus editions) set a file path here: raw and processed chunks
+    # are then kept in that file instead of in memory, the file is removed at the end
+    chunk_store_path = None
+    if chunk_store_path:
+        chunk_store = ChunkStore(chunk_store_path, truncate=True)
+        chunks = chunk_store.chunks("raw")
+        chunks.extend(parser.iter_chunks(book))
+        processed_chunks = chunk_store.chunks("processed")
+    else:
+        chunks = parser.parse(book)
+        processed_chunks = []
+
+    # ranked candidate names per chunk for the prompt, found locally in the whole book (None to leave them out)
+    candidate_index = CandidateIndex(limit=10).build(chunks)
+
+    # speaker groups from earlier runs are applied automatically, reuse the same file for all books of a series
+    alias_file_path = "aliases.json"
+    alias_store = AliasStore.load(alias_file_path)
+
+    # set to True to open the GUI right away and group speakers while the book is still being indexed
+    concurrent_gui = False
+    # more than 1 processes that many chapters in parallel, each with its own rolling context
+    chapter_workers = 1
+    # set to True to stream the speaker answers and apply each speaker as soon as it arrives
+    streaming = False
+
+    # model_routing=True sends only hard chunks to the stronger (more expensive) model,
+    # tune routing_threshold with the printed per-tier report and the accuracy from benchmark.py
+    indexer_options = {"model_routing": False, "routing_threshold": 40.0, "streaming": streaming,
+                       "candidate_index": candidate_index}
+    indexer = SpeechIndexer("openai", **indexer_options)  # alternative: "deepseek"
+    indexers = [indexer]
+    if chapter_workers > 1:
+        indexers = index_chunks_by_item(
+            lambda: SpeechIndexer("openai", speaker_registry=indexer.speaker_registry, context_scope="item",
+                                  **indexer_options),
+            chunks, processed_chunks, workers=chapter_workers,
+        )
+    elif concurrent_gui:
+        speaker_queue = queue.Queue()
+        worker_errors = []
+
+        def index_in_background():
+            try:
+                index_chunks(indexer, chunks, processed_chunks, speaker_queue)
+            except Exception as err:
+                worker_errors.append(err)
+
+        worker = threading.Thread(target=index_in_background, daemon=True)
+        worker.start()
+
+        root = tk.Tk()
+        app = SpeakerAliasUI(root, indexer.speaker_registry, alias_store=alias_store)
+        app.poll_speaker_queue(speaker_queue)
+        root.mainloop()
+
+        # the GUI may be closed before the indexing is done
+        worker.join()
+        if worker_errors:
+            # e.g. an API error, don't write a partly annotated book
+            raise worker_errors[0]
+        alias_store.update(app.get_final_mapping())
+    else:
+        index_chunks(indexer, chunks, processed_chunks)
+
+    # with chapter_workers > 1 the chunks went through the chapter indexers, not through indexer
+    if indexer_options["model_routing"]:
+        print(f"Model routing: {ModelRouter.combined_report([used.router for used in indexers])}")
+        # tier per chunk, to split the accuracy from benchmark.py by tier
+        save_chunk_tiers(indexers, "tiers.json")
+    if streaming:
+        stream_metrics = [metric for used in indexers for metric in used.stream_metrics]
+        print(f"Streaming: {SpeechIndexer.summarise_stream_metrics(stream_metrics)}")
 
-    root = tk.Tk()
-    app = SpeakerAliasUI(root)
-    root.mainloop()
+    # keep the detected speakers so the GUI or later stages can reload them without re-indexing
+    indexer.speaker_registry.save("speakers.json")
 
-    final_mapping = app.get_final_mapping()
+    # the GUI only opens for speakers that are still uncovered (with proposed alias groups preloaded),
+    # headless=True never opens it
+    final_mapping = alias_store.resolve(indexer.speaker_registry, headless=False)
+    alias_store.save(alias_file_path)
 
     reparser = Reparser(book, processed_chunks, final_mapping=final_mapping)
     reparser.save("output.epub") # here you can specify the output file name and a path relative to the current working directory
+    if chunk_store_path:
+        chunk_store.close(remove=True)
+    print(f"Peak memory: {peak_rss_mb()} MB")
     
     # Run this script to start the processing
     # When the GUI opens, make sure to create a group for each speaker, even if they have no aliases.
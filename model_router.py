@@ -0,0 +1,179 @@
+import re
+import threading
+import time
+
+SPEECH_VERBS = (
+    "said|says|asked|replied|answered|cried|shouted|whispered|muttered|called|added|continued|thought|"
+    "sagte|fragte|antwortete|rief|flüsterte|meinte|dachte"
+)
+# capitalised words that are no names
+COMMON_WORDS = {
+    "The", "A", "An", "And", "But", "Or", "I", "He", "She", "It", "We", "They", "You", "His", "Her",
+    "Their", "This", "That", "What", "Who", "Why", "How", "When", "Where", "Yes", "No", "Oh", "Well",
+    "Der", "Die", "Das", "Ein", "Eine", "Er", "Sie", "Es", "Wir", "Ich", "Und", "Aber", "Ja", "Nein",
+}
+
+
+class ModelRouter:
+    """
+    Sends easy chunks to the cheap model of a client and hard ones to its
+    strong model (see the MODELS tiers of the API clients).
+
+    Difficulty is scored from local signals of the tagged chunk:
+    • number of speech/thought segments
+    • number of distinct candidate names
+    • the longest run of segments without a speech verb next to them
+    • parse failures of the recent chunks
+    A cheap answer that cannot be parsed is retried once on the strong model.
+    """
+
+    def __init__(self, api_client, threshold=40.0, weights=None, failure_decay=3):
+        self.api_client = api_client
+        self.threshold = threshold
+        self.weights = {"segments": 1.0, "names": 2.0, "unattributed_run": 4.0, "failures": 15.0}
+        self.weights.update(weights or {})
+        # number of chunks a parse failure keeps counting for
+        self.failure_decay = failure_decay
+        self.recent_failures: list[int] = []
+        self.chunk_count = 0
+
+        self._lock = threading.Lock()
+        self.stats = {
+            tier: {"calls": 0, "seconds": 0.0, "failures": 0}
+            for tier in ("cheap", "strong")
+        }
+        self.escalations = 0
+        # tier that answered the last request: "cheap", "strong" or "escalated" (cheap retried on strong)
+        self.last_tier: str | None = None
+
+    # --------------------------------------------------------------------- #
+    # -------------------------- public interface ------------------------- #
+    # --------------------------------------------------------------------- #
+    def get_speakers(self, conversation_history, tagged_text, parse):
+        """
+        Same result as api_client.get_speakers, but with the model picked by
+        difficulty. `parse` raises ValueError for an unusable answer.
+        """
+        tier = self._next_tier(tagged_text)
+        response = self._call(tier, conversation_history)
+        self.last_tier = tier
+        if tier == "cheap" and not self._parses(response, parse):
+            self._record_failure("cheap")
+            with self._lock:
+                self.escalations += 1
+            response = self._call("strong", conversation_history)
+            self.last_tier = "escalated"
+        if not self._parses(response, parse):
+            self._record_failure("strong")
+        return response
+
+    def stream_speakers(self, conversation_history, tagged_text, parse):
+        """
+        Same pieces as api_client.stream_speakers, from the model picked by
+        difficulty. Attributions are applied while they arrive, so an
+        unusable answer is only counted as failure, not retried.
+        """
+        tier = self._next_tier(tagged_text)
+        self.last_tier = tier
+        start = time.perf_counter()
+        pieces = []
+        for piece in self.api_client.stream_speakers(
+            conversation_history, model=self.api_client.MODELS[tier]
+        ):
+            pieces.append(piece)
+            yield piece
+        with self._lock:
+            self.stats[tier]["calls"] += 1
+            self.stats[tier]["seconds"] += time.perf_counter() - start
+        if not self._parses("".join(pieces), parse):
+            self._record_failure(tier)
+
+    def score(self, tagged_text: str) -> float:
+        signals = self.signals(tagged_text)
+        return sum(self.weights[key] * value for key, value in signals.items())
+
+    def signals(self, tagged_text: str) -> dict:
+        segments = re.findall(r'<(speech|em) index="\d+">', tagged_text)
+        plain = re.sub(r"<[^>]+>", " ", tagged_text)
+        names = {
+            m.group(1)
+            for m in re.finditer(r"(?<![.!?:]\s)(?<![„“”\"»«‚‘’›‹])\b([A-Z][a-zäöüß]+)\b", plain)
+            if m.group(1) not in COMMON_WORDS
+        }
+        recent = [i for i in self.recent_failures if self.chunk_count - i <= self.failure_decay]
+        return {
+            "segments": len(segments),
+            "names": len(names),
+            "unattributed_run": self._longest_unattributed_run(tagged_text),
+            "failures": len(recent),
+        }
+
+    def report(self) -> dict:
+        return self.combined_report([self])
+
+    @staticmethod
+    def combined_report(routers) -> dict:
+        """report() over several routers, e.g. of the chapter indexers of one book."""
+        report = {}
+        for tier in ("cheap", "strong"):
+            calls = failures = seconds = 0
+            for router in routers:
+                with router._lock:
+                    calls += router.stats[tier]["calls"]
+                    failures += router.stats[tier]["failures"]
+                    seconds += router.stats[tier]["seconds"]
+            report[tier] = {
+                "calls": calls,
+                "failures": failures,
+                "avg_seconds": round(seconds / calls, 3) if calls else 0,
+            }
+        report["escalations"] = sum(router.escalations for router in routers)
+        return report
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- helpers ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def _next_tier(self, tagged_text):
+        self.chunk_count += 1
+        self.recent_failures = [
+            i for i in self.recent_failures if self.chunk_count - i <= self.failure_decay
+        ]
+        return "strong" if self.score(tagged_text) >= self.threshold else "cheap"
+
+    def _call(self, tier, conversation_history):
+        start = time.perf_counter()
+        response = self.api_client.get_speakers(
+            conversation_history, model=self.api_client.MODELS[tier]
+        )
+        with self._lock:
+            self.stats[tier]["calls"] += 1
+            self.stats[tier]["seconds"] += time.perf_counter() - start
+        return response
+
+    def _record_failure(self, tier):
+        self.recent_failures.append(self.chunk_count)
+        with self._lock:
+            self.stats[tier]["failures"] += 1
+
+    @staticmethod
+    def _parses(response, parse) -> bool:
+        try:
+            parse(response)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def _longest_unattributed_run(tagged_text: str) -> int:
+        """Longest run of speech segments whose surrounding narration has no speech verb."""
+        parts = re.split(r"<speech index=\"\d+\">.*?</speech>", tagged_text, flags=re.DOTALL)
+        # parts[i] is the narration before segment i, parts[i + 1] the one after it
+        longest = run = 0
+        verb = re.compile(fr"\b({SPEECH_VERBS})\b", re.IGNORECASE)
+        for before, after in zip(parts, parts[1:]):
+            if verb.search(before[-120:]) or verb.search(after[:120]):
+                run = 0
+            else:
+                run += 1
+                longest = max(longest, run)
+        return longest
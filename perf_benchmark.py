@@ -0,0 +1,262 @@
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from ebooklib import epub
+
+from epub_book_parser import EpubParser
+from indexer import SpeechIndexer
+from reparser import Reparser
+
+# performance counterpart to benchmark.py: measures throughput instead of accuracy,
+# fully offline (synthetic EPUBs, OfflineClient instead of an API), how to run it is at the bottom of this file
+
+# name -> (document items, paragraphs per item, share of paragraphs with dialogue)
+DEFAULT_CASES: Dict[str, Tuple[int, int, float]] = {
+    "small": (5, 40, 0.3),
+    "medium": (20, 120, 0.5),
+    "large": (60, 200, 0.7),
+}
+STAGES = ("parse", "tag", "attribution", "reparse")
+
+WORDS = (
+    "the a house night door window road letter morning garden time hand eyes "
+    "never always quickly slowly again perhaps indeed still only very long old "
+    "went came looked turned stood waited opened closed knew found heard"
+).split()
+NAMES = ["Anna", "Darcy", "Elizabeth", "Holmes", "Watson", "Martha", "Jonas", "Clara"]
+VERBS = ["said", "asked", "replied", "cried", "whispered"]
+
+
+class SyntheticEpub:
+    """Reproducible EPUBs of a given size and dialogue density."""
+
+    def __init__(self, seed: int = 42) -> None:
+        self.seed = seed
+
+    def write(self, path: str, items: int, paragraphs: int, density: float) -> None:
+        rng = random.Random(f"{self.seed}-{items}-{paragraphs}-{density}")
+        book = epub.EpubBook()
+        book.set_identifier(f"synthetic-{items}-{paragraphs}-{density}")
+        book.set_title("Synthetic Benchmark Book")
+        book.set_language("en")
+
+        chapters = []
+        for n in range(items):
+            chapter = epub.EpubHtml(title=f"Chapter {n + 1}", file_name=f"chapter_{n}.xhtml", lang="en")
+            body = [f"<h2>Chapter {n + 1}</h2>"]
+            body += [self._paragraph(rng, density) for _ in range(paragraphs)]
+            chapter.content = f"<html><body>{''.join(body)}</body></html>"
+            book.add_item(chapter)
+            chapters.append(chapter)
+
+        # no table of contents: ebooklib reads nav links back without ids and
+        # could not write the book again after the reparse
+        book.spine = ["nav"] + chapters
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+        epub.write_epub(path, book)
+
+    @staticmethod
+    def _sentence(rng: random.Random) -> str:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(4, 14))]
+        return " ".join(words).capitalize()
+
+    def _paragraph(self, rng: random.Random, density: float) -> str:
+        if rng.random() >= density:
+            return f"<p>{self._sentence(rng)}. {self._sentence(rng)}.</p>"
+        name, verb = rng.choice(NAMES), rng.choice(VERBS)
+        kind = rng.random()
+        if kind < 0.15:
+            return f"<p><em>{self._sentence(rng)}</em>, {name} thought.</p>"
+        if kind < 0.3:
+            return f"<p>„{self._sentence(rng)}“, {verb} {name}.</p>"
+        if kind < 0.45:
+            # speech spanning an inline tag
+            return f"<p>“{self._sentence(rng)} <i>{rng.choice(WORDS)}</i> {self._sentence(rng)}” {name} {verb}.</p>"
+        return f"<p>“{self._sentence(rng)},” {verb} {name}. “{self._sentence(rng)}.”</p>"
+
+
+class PerformanceBenchmark:
+    # ------------------------------------------------------------------ #
+    # Construction                                                       #
+    # ------------------------------------------------------------------ #
+    def __init__(
+        self,
+        cases: Dict[str, Tuple[int, int, float]] | None = None,
+        chunk_size: int = 2000,
+        repeat: int = 3,
+        seed: int = 42,
+    ) -> None:
+        self.cases = cases or DEFAULT_CASES
+        self.chunk_size = chunk_size
+        self.repeat = repeat
+        self.generator = SyntheticEpub(seed)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+    def run(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        results[case][stage] -> {"seconds", "chunks_per_s", "tags_per_s", "peak_mb"}
+
+        Timings are the best of `repeat` runs, peak memory is measured in a
+        separate run under tracemalloc so it does not distort the timings.
+        """
+        results: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, (items, paragraphs, density) in self.cases.items():
+                path = os.path.join(tmp, f"{name}.epub")
+                self.generator.write(path, items, paragraphs, density)
+
+                best: Dict[str, float] = {}
+                for _ in range(self.repeat):
+                    seconds, counts = self._run_pipeline(path, trace_memory=False)
+                    for stage, value in seconds.items():
+                        best[stage] = min(best.get(stage, value), value)
+                peaks, _ = self._run_pipeline(path, trace_memory=True)
+
+                results[name] = {
+                    stage: {
+                        "seconds": round(best[stage], 4),
+                        "chunks_per_s": round(counts["chunks"] / best[stage], 1) if best[stage] else 0,
+                        "tags_per_s": round(counts["tags"] / best[stage], 1) if best[stage] else 0,
+                        "peak_mb": round(peaks[stage], 2),
+                    }
+                    for stage in STAGES
+                }
+                print(f"[{name}] {counts['chunks']} chunks, {counts['tags']} tags")
+        return results
+
+    @staticmethod
+    def compare(
+        results: Dict[str, Dict[str, Dict[str, float]]],
+        baseline: Dict[str, Dict[str, Dict[str, float]]],
+        threshold: float = 0.25,
+    ) -> List[str]:
+        """
+        Returns one message per regression: throughput more than `threshold`
+        below the baseline, or peak memory more than `threshold` above it.
+        """
+        regressions = []
+        for case, stages in results.items():
+            for stage, metrics in stages.items():
+                base = baseline.get(case, {}).get(stage)
+                if not base:
+                    continue
+                for key in ("chunks_per_s", "tags_per_s"):
+                    if base.get(key) and metrics[key] < base[key] * (1 - threshold):
+                        regressions.append(
+                            f"{case}/{stage}: {key} {metrics[key]} < baseline {base[key]}"
+                        )
+                if base.get("peak_mb") and metrics["peak_mb"] > base["peak_mb"] * (1 + threshold):
+                    regressions.append(
+                        f"{case}/{stage}: peak_mb {metrics['peak_mb']} > baseline {base['peak_mb']}"
+                    )
+        return regressions
+
+    # ------------------------------------------------------------------ #
+    # Pipeline stages                                                    #
+    # ------------------------------------------------------------------ #
+    def _run_pipeline(self, path: str, trace_memory: bool) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """
+        Runs all stages once on a fresh copy of the book. Returns seconds per
+        stage (or peak MB per stage with `trace_memory`) and the chunk/tag counts.
+        """
+        book = epub.read_epub(path)
+        indexer = SpeechIndexer("offline")
+        measured: Dict[str, float] = {}
+
+        def measure(stage, func):
+            if trace_memory:
+                tracemalloc.start()
+                result = func()
+                measured[stage] = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+            else:
+                start = time.perf_counter()
+                result = func()
+                measured[stage] = time.perf_counter() - start
+            return result
+
+        chunks = measure("parse", lambda: EpubParser(chunk_size=self.chunk_size).parse(book))
+        tagged = measure(
+            "tag", lambda: [indexer._find_and_tag_speech_and_thoughts(c) for c in chunks]
+        )
+
+        # speaker answers come from the offline client, only the replacement is timed
+        jobs = []
+        for chunk in tagged:
+            text = chunk.get_content()
+            speech_indexes = indexer._extract_indexes(text, "speech")
+            thought_indexes = indexer._extract_indexes(text, "em")
+            speakers_dict = json.loads(
+                indexer.api_client.get_speakers([{"role": "user", "content": text}])
+            )
+            indexer._validate_speaker_names(speakers_dict)
+            jobs.append((chunk, speakers_dict, speech_indexes, thought_indexes))
+        processed = measure(
+            "attribution", lambda: [indexer._replace_all_indexes(*job) for job in jobs]
+        )
+
+        mapping = {name: [name] for name in NAMES}
+        measure("reparse", lambda: Reparser(book, processed, final_mapping=mapping).reparse())
+
+        counts = {
+            "chunks": len(chunks),
+            "tags": sum(len(s) + len(t) for _, _, s, t in jobs),
+        }
+        return measured, counts
+
+
+# ---------------------------main----------------------------------- #
+# how to run the performance benchmark:
+# 1. On the machine you want to compare on, record a baseline once. No baseline is committed, since the
+#    timings depend on the machine; the first run without one records it, --update-baseline replaces it:
+#       python perf_benchmark.py --update-baseline
+# 2. After a change, run it again. Stages that lost more than --threshold of their throughput
+#    (or grew their peak memory by that much) are listed and the script exits with code 1:
+#       python perf_benchmark.py
+# Timings depend on the machine, so only compare against a baseline recorded on the same one.
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Performance benchmark for parser, tagger, attribution and reparser")
+    arg_parser.add_argument("--baseline", default="perf_baseline.json", help="baseline file to compare against")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store the results as new baseline")
+    arg_parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best one counts")
+    arg_parser.add_argument("--cases", nargs="+", choices=list(DEFAULT_CASES), help="subset of cases to run")
+    args = arg_parser.parse_args()
+
+    cases = {name: DEFAULT_CASES[name] for name in args.cases} if args.cases else None
+    pb = PerformanceBenchmark(cases=cases, repeat=args.repeat)
+    results = pb.run()
+
+    print(f"{'case':<8} {'stage':<12} {'seconds':>9} {'chunks/s':>10} {'tags/s':>11} {'peak MB':>8}")
+    for case, stages in results.items():
+        for stage, m in stages.items():
+            print(
+                f"{case:<8} {stage:<12} {m['seconds']:>9} {m['chunks_per_s']:>10} "
+                f"{m['tags_per_s']:>11} {m['peak_mb']:>8}"
+            )
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        if not args.update_baseline:
+            # first run on this machine (no baseline is committed, timings are machine-specific)
+            print(f"No baseline at {args.baseline} yet, nothing to compare against on this first run.")
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}, later runs report regressions against it.")
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = PerformanceBenchmark.compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print("No regressions against the baseline.")
@@ -0,0 +1,107 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from chunk_store import StoredChunks
+
+# indexing loops shared by main.py (GUI), cli.py and service.py, kept free of tkinter
+
+
+def index_chunks(indexer, chunks, processed_chunks, speaker_queue=None, on_progress=None):
+    """
+    Processes all chunks in order, newly detected speakers are put on the queue if given.
+    None is put on the queue at the end, also when processing fails.
+    on_progress(done, total) is called after every chunk.
+    """
+    seen_speakers = 0
+
+    def publish_speakers(*_):
+        nonlocal seen_speakers
+        # registry names are kept in order of first appearance
+        names = indexer.speaker_registry.names()
+        if len(names) > seen_speakers:
+            speaker_queue.put(names[seen_speakers:])
+            seen_speakers = len(names)
+
+    if speaker_queue is not None and indexer.streaming:
+        # streamed speakers reach the GUI before their chunk is complete
+        indexer.on_attribution = publish_speakers
+
+    try:
+        for i, chunk in enumerate(chunks):
+            processed_chunk = indexer.process_chunk(chunk)
+            processed_chunks.append(processed_chunk)
+            print(f"Processed Chunkgroup {processed_chunk.get_index()} Number {i+1}")
+            if on_progress is not None:
+                on_progress(i + 1, len(chunks))
+
+            if speaker_queue is not None:
+                publish_speakers()
+    finally:
+        # also on errors, otherwise the GUI keeps waiting for more speakers
+        if speaker_queue is not None:
+            speaker_queue.put(None)
+
+
+def index_chunks_by_item(make_indexer, chunks, processed_chunks, workers=4, on_progress=None):
+    """
+    Processes the EPUB document items (chapters) in parallel. Every worker thread gets its own
+    indexer from make_indexer(), which should use context_scope="item" and a shared speaker registry.
+    processed_chunks keeps the original chunk order. Returns the indexers that were used.
+    """
+    # only positions are kept, the chunks are fetched when their item is processed
+    items = {}
+    for position, chunk in enumerate(chunks):
+        items.setdefault(chunk.get_index().split(".")[0], []).append(position)
+
+    # a chunk store takes every processed chunk right away, then only its index is kept until the order is known
+    spill = isinstance(processed_chunks, StoredChunks)
+    results = [None] * len(chunks)
+    indexers = []
+    local = threading.local()
+    lock = threading.Lock()
+    done = 0
+
+    def process_item(positions):
+        nonlocal done
+        if not hasattr(local, "indexer"):
+            local.indexer = make_indexer()
+            with lock:
+                indexers.append(local.indexer)
+        for position in positions:
+            processed_chunk = local.indexer.process_chunk(chunks[position])
+            if spill:
+                processed_chunks.put(processed_chunk)
+                results[position] = processed_chunk.get_index()
+            else:
+                results[position] = processed_chunk
+            print(f"Processed Chunkgroup {processed_chunk.get_index()}")
+            with lock:
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, len(chunks))
+
+    # longest chapters first, so a long one does not start last
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(process_item, sorted(items.values(), key=len, reverse=True)))
+
+    if spill:
+        for chunk_index in results:
+            processed_chunks.append_index(chunk_index)
+    else:
+        processed_chunks.extend(results)
+    return indexers
+
+
+def save_chunk_tiers(indexers, path):
+    """
+    Writes the model tier of every routed chunk in book order, with the number of its speech and
+    thought segments: {"3.0": {"tier": "cheap", "speech": 4, "thought": 1}, ...}.
+    benchmark.py (EpubBenchmark.tier_report) splits the accuracy of the annotated book by it.
+    """
+    chunk_tiers = {}
+    for indexer in indexers:
+        chunk_tiers.update(indexer.chunk_tiers)
+    ordered = sorted(chunk_tiers, key=lambda index: tuple(int(part) for part in index.split(".")))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({index: chunk_tiers[index] for index in ordered}, f, indent=2)
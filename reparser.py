@@ -22,41 +22,54 @@ class Reparser:
         updated_text = re.sub(pattern, repl, text)
         return updated_text
     
-    # Parses the book and updates the content of each HTML item with the combined content of its chunks
+    # Parses the book and updates the content of each HTML item with the combined content of its chunks.
+    # The chunks are read one item at a time (they come in book order), so a lazy chunk source such as
+    # a ChunkStore never has to be loaded as a whole.
     def reparse(self):
         new_book = self.book
 
-        chunk_dict = {}
-        for chunk in self.chunks:
-            item_index = int(chunk.get_index().split('.')[0])
-            if item_index not in chunk_dict:
-                chunk_dict[item_index] = []
-            chunk_dict[item_index].append(chunk)
-
-        print(f"Number of chunk groups: {len(chunk_dict)}")
-        for index, chunks in chunk_dict.items():
-            print(f"Chunk group index: {index}, number of chunks: {len(chunks)}")
-
         html_items = list(new_book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
         print(f"Number of HTML items: {len(html_items)}")
 
-        for i, item in enumerate(html_items):
-            print(f"Processing item {i}: {item.file_name}")
+        updated = set()
+        for index, contents in self._chunk_groups():
+            print(f"Chunk group index: {index}, number of chunks: {len(contents)}")
+            if index >= len(html_items):
+                print(f"No HTML item found for chunk group {index}")
+                continue
+            item = html_items[index]
+            print(f"Processing item {index}: {item.file_name}")
 
-            chunk_group = chunk_dict.get(i, None)
+            combined_content = ''.join(contents)
+            if self.final_mapping:
+                combined_content = self.update_speaker_mapping(combined_content, self.final_mapping)
+            if index in updated:
+                # chunks of this item that were not next to the others
+                combined_content = item.get_content().decode('utf-8') + combined_content
+            print(f"New content preview: {combined_content[:100]}...")
+            item.set_content(combined_content.encode('utf-8'))
+            updated.add(index)
 
-            if chunk_group:
-                print(f"Found chunk group for index {i}")
-                combined_content = ''.join(chunk.get_content() for chunk in chunk_group)
-                if self.final_mapping:
-                    combined_content = self.update_speaker_mapping(combined_content, self.final_mapping)
-                print(f"New content preview: {combined_content[:100]}...")
-                item.set_content(combined_content.encode('utf-8'))
-            else:
+        print(f"Number of chunk groups: {len(updated)}")
+        for i, item in enumerate(html_items):
+            if i not in updated:
                 print(f"No chunk group found for index {i}")
 
         return new_book
-    
+
+    # yields (item index, chunk contents) for each run of consecutive chunks of the same item
+    def _chunk_groups(self):
+        index, contents = None, []
+        for chunk in self.chunks:
+            item_index = int(chunk.get_index().split('.')[0])
+            if item_index != index and contents:
+                yield index, contents
+                contents = []
+            index = item_index
+            contents.append(chunk.get_content())
+        if contents:
+            yield index, contents
+
     # Saves the modified book to a new EPUB file
     def save(self, output_filename):
         new_book = self.reparse()
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cli import BatchRunner
+
+# small self-hosted job service around the pipeline (EpubParser -> SpeechIndexer -> Reparser)
+#   python service.py --data-dir jobs --provider offline --max-jobs 2
+#   curl --data-binary @book.epub "http://localhost:8080/jobs?filename=book.epub"   -> {"id": ...}
+#   curl http://localhost:8080/jobs/<id>                                             -> status and progress
+#   curl -o annotated.epub http://localhost:8080/jobs/<id>/result
+
+
+class JobStore:
+    """
+    Jobs in a SQLite database, so the queue survives restarts. Jobs that were
+    running when the service stopped are queued again on startup.
+    """
+
+    COLUMNS = ("id", "filename", "status", "chunks_done", "chunks_total", "error", "created", "updated")
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                status TEXT NOT NULL,
+                chunks_done INTEGER NOT NULL DEFAULT 0,
+                chunks_total INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+        with self._lock, self.db:
+            self.db.execute(
+                "UPDATE jobs SET status = 'queued', chunks_done = 0, updated = ? WHERE status = 'running'",
+                (time.time(),),
+            )
+
+    def add(self, job_id, filename):
+        now = time.time()
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO jobs (id, filename, status, created, updated) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, filename, now, now),
+            )
+        return job_id
+
+    def claim(self):
+        """Marks the oldest queued job as running and returns it, None if there is none."""
+        with self._lock, self.db:
+            row = self.db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE jobs SET status = 'running', updated = ? WHERE id = ?", (time.time(), row[0])
+            )
+        return self.get(row[0])
+
+    def update(self, job_id, **fields):
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self.db:
+            self.db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self.db.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(zip(self.COLUMNS, row)) if row else None
+
+    def list(self):
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs ORDER BY created"
+            ).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+
+class JobService:
+    """
+    Uploads, results and the job database live in data_dir; max_jobs workers
+    run the queue. Every job resolves its speaker groups on its own unless
+    alias_file is given.
+    """
+
+    def __init__(self, data_dir, provider="openai", chunk_size=2000, max_jobs=1, max_requests=4,
+                 alias_file=None, poll_interval=1.0):
+        self.data_dir = data_dir
+        self.upload_dir = os.path.join(data_dir, "uploads")
+        self.result_dir = os.path.join(data_dir, "results")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.result_dir, exist_ok=True)
+
+        self.jobs = JobStore(os.path.join(data_dir, "jobs.sqlite3"))
+        self.runner = BatchRunner(self.result_dir, provider=provider, chunk_size=chunk_size,
+                                  max_requests=max_requests, alias_file=alias_file)
+        self.max_jobs = max_jobs
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._workers = []
+
+    # --------------------------------------------------------------------- #
+    # ------------------------------- jobs -------------------------------- #
+    # --------------------------------------------------------------------- #
+    def submit(self, filename, data):
+        job_id = uuid.uuid4().hex
+        # the name is sent back in a response header, only plain characters are kept
+        filename = re.sub(r"[^\w.\- ]", "_", os.path.basename(filename)) or "book.epub"
+        # the upload is complete on disk before a worker can claim the job
+        upload_path = self.upload_path(job_id)
+        with open(upload_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(upload_path + ".tmp", upload_path)
+        self.jobs.add(job_id, filename)
+        self._wakeup.set()
+        return job_id
+
+    def upload_path(self, job_id):
+        return os.path.join(self.upload_dir, f"{job_id}.epub")
+
+    def result_path(self, job_id):
+        return os.path.join(self.result_dir, f"{job_id}.epub")
+
+    def start(self):
+        for _ in range(self.max_jobs):
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join()
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.jobs.claim()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job["id"])
+
+    def _run(self, job_id):
+        def on_progress(done, total):
+            self.jobs.update(job_id, chunks_done=done, chunks_total=total)
+
+        try:
+            self.runner.process_book(self.upload_path(job_id), self.result_path(job_id), on_progress=on_progress)
+        except Exception as err:
+            print(f"[JobService] job {job_id} failed: {err}")
+            self.jobs.update(job_id, status="failed", error=str(err))
+        else:
+            self.jobs.update(job_id, status="done")
+
+
+def make_handler(service):
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/jobs":
+                return self._send_json(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                return self._send_json(400, {"error": "invalid Content-Length"})
+            if length <= 0:
+                return self._send_json(400, {"error": "empty upload, send the EPUB as request body"})
+            filename = parse_qs(url.query).get("filename", ["book.epub"])[0]
+            job_id = service.submit(filename, self.rfile.read(length))
+            self._send_json(202, service.jobs.get(job_id))
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/jobs":
+                return self._send_json(200, service.jobs.list())
+
+            match = re.fullmatch(r"/jobs/([0-9a-f]+)(/result)?", path)
+            job = service.jobs.get(match.group(1)) if match else None
+            if job is None:
+                return self._send_json(404, {"error": "unknown job"})
+            if not match.group(2):
+                return self._send_json(200, job)
+            if job["status"] != "done":
+                return self._send_json(409, {"error": f"job is {job['status']}"})
+
+            with open(service.result_path(job["id"]), "rb") as f:
+                data = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/epub+zip")
+            self.send_header("Content-Disposition", f'attachment; filename="{job["filename"]}"')
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return JobRequestHandler
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="HTTP job service for speaker annotation.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("-d", "--data-dir", default="jobs", help="uploads, results and job database")
+    arg_parser.add_argument("-p", "--provider", choices=["openai", "deepseek", "offline"], default="openai")
+    arg_parser.add_argument("-c", "--chunk-size", type=int, default=2000, help="characters per chunk")
+    arg_parser.add_argument("-j", "--max-jobs", type=int, default=1, help="jobs processed at the same time")
+    arg_parser.add_argument("-r", "--max-requests", type=int, default=4,
+                            help="concurrent API requests across all jobs")
+    arg_parser.add_argument("-a", "--aliases", default=None,
+                            help="alias file shared by all jobs (only for one series); "
+                                 "by default every job is grouped on its own")
+    args = arg_parser.parse_args(argv)
+
+    service = JobService(args.data_dir, provider=args.provider, chunk_size=args.chunk_size,
+                         max_jobs=args.max_jobs, max_requests=args.max_requests, alias_file=args.aliases)
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+class IncrementalSpeakerParser:
+    """
+    Parses a streamed speakers answer of the form
+        {"speech": {"1": "John", ...}, "thought": {"1": "Sarah", ...}}
+    piece by piece. feed() returns every (category, index, name) whose
+    key/value pair was completed by the new piece, so attributions can be
+    applied before the answer is complete. Text before the first "{" (e.g. a
+    code fence) is skipped, values of other shapes are ignored.
+    """
+
+    CATEGORIES = ("speech", "thought")
+    ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.path: list[str | None] = []  # keys of the open objects
+        self.pending_key: str | None = None
+        self.expect_value = False
+        self.in_string = False
+        self.escape = False
+        self.unicode_digits: str | None = None
+        self.buffer: list[str] = []
+        self.scalar: list[str] = []
+
+    def feed(self, text: str) -> list[tuple[str, str, str]]:
+        events = []
+        for ch in text:
+            if self.finished:
+                break
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.path.append(None)
+                continue
+
+            if self.in_string:
+                self._string_char(ch, events)
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.buffer = []
+            elif ch == ":":
+                self.expect_value = True
+            elif ch in ",}":
+                self._flush_scalar(events)
+                self.expect_value = False
+                self.pending_key = None
+                if ch == "}":
+                    self.path.pop()
+                    self.finished = not self.path
+            elif ch == "{":
+                self.path.append(self.pending_key)
+                self.pending_key = None
+                self.expect_value = False
+            elif self.expect_value and not ch.isspace():
+                self.scalar.append(ch)  # numbers, null, true/false
+        return events
+
+    # --------------------------------------------------------------------- #
+    # ----------------------------- helpers ------------------------------- #
+    # --------------------------------------------------------------------- #
+    def _string_char(self, ch: str, events: list) -> None:
+        if self.unicode_digits is not None:
+            self.unicode_digits += ch
+            if len(self.unicode_digits) == 4:
+                try:
+                    self.buffer.append(chr(int(self.unicode_digits, 16)))
+                except ValueError:
+                    pass
+                self.unicode_digits = None
+        elif self.escape:
+            self.escape = False
+            if ch == "u":
+                self.unicode_digits = ""
+            else:
+                self.buffer.append(self.ESCAPES.get(ch, ch))
+        elif ch == "\\":
+            self.escape = True
+        elif ch == '"':
+            self.in_string = False
+            value = "".join(self.buffer)
+            if self.expect_value:
+                self._value(value, events)
+                self.expect_value = False
+            else:
+                self.pending_key = value
+        else:
+            self.buffer.append(ch)
+
+    def _flush_scalar(self, events: list) -> None:
+        if self.scalar:
+            value = "".join(self.scalar)
+            self._value("" if value == "null" else value, events)
+            self.scalar = []
+
+    def _value(self, value: str, events: list) -> None:
+        category = self.path[-1] if len(self.path) == 2 else None
+        if category in self.CATEGORIES and self.pending_key is not None:
+            events.append((category, self.pending_key, value))
@@ -0,0 +1,76 @@
+from alias_clustering import AliasClusterer
+from all_speakers import SpeakerRegistry
+
+
+def cluster(mentions, **kwargs):
+    """mentions: {name: [chunk index, ...]}"""
+    registry = SpeakerRegistry()
+    for name, chunks in mentions.items():
+        for chunk in chunks:
+            registry.add([name], chunk)
+    return AliasClusterer(registry).cluster(**kwargs)
+
+
+def group_of(groups, name):
+    return next((sorted(aliases) for aliases in groups.values() if name in aliases), None)
+
+
+def test_normalise_and_title_gender():
+    assert AliasClusterer.normalise("Mr. Fitzwilliam  Darcy") == ("fitzwilliam", "darcy")
+    assert AliasClusterer.title_gender("Mr. Bennet") == "m"
+    assert AliasClusterer.title_gender("Mrs. Bennet") == "f"
+    assert AliasClusterer.title_gender("Dr. Watson") is None
+    assert AliasClusterer.title_gender("Bennet") is None
+
+
+def test_conflicting_titles_are_never_merged():
+    groups = cluster({"Mr. Bennet": ["0.1", "0.2"], "Mrs. Bennet": ["0.1", "0.2"]}, include_singletons=True)
+    assert group_of(groups, "Mr. Bennet") == ["Mr. Bennet"]
+    assert group_of(groups, "Mrs. Bennet") == ["Mrs. Bennet"]
+
+
+def test_spellings_of_the_same_titled_name_are_merged():
+    groups = cluster({"Mr. Darcy": ["0.1"], "Mr Darcy": ["5.0"], "Darcy": ["0.2"]})
+    assert group_of(groups, "Darcy") == ["Darcy", "Mr Darcy", "Mr. Darcy"]
+
+
+def test_untitled_name_stays_alone_with_two_gendered_variants():
+    groups = cluster({"Bennet": ["0.1"], "Mr. Bennet": ["0.1"], "Mrs. Bennet": ["0.1"]})
+    assert group_of(groups, "Bennet") is None
+
+
+def test_single_superset_needs_co_occurrence():
+    assert cluster({"Darcy": ["0.2"], "Fitzwilliam Darcy": ["7.3"]}) == {}
+
+    groups = cluster({"Darcy": ["0.2"], "Fitzwilliam Darcy": ["0.5"]})
+    assert group_of(groups, "Darcy") == ["Darcy", "Fitzwilliam Darcy"]
+
+
+def test_ambiguous_short_form_is_left_alone():
+    groups = cluster({"Bennet": ["1.0"], "Jane Bennet": ["1.0"], "Elizabeth Bennet": ["1.0"]})
+    assert group_of(groups, "Bennet") is None
+
+
+def test_short_form_prefers_the_name_it_shares_chunks_with():
+    groups = cluster({"Bennet": ["1.0"], "Jane Bennet": ["1.0"], "Elizabeth Bennet": ["1.3"]})
+    assert group_of(groups, "Bennet") == ["Bennet", "Jane Bennet"]
+
+
+def test_titled_short_form_does_not_join_an_untitled_name():
+    groups = cluster({"Mrs. Bennet": ["0.1"], "Elizabeth Bennet": ["0.1"]})
+    assert groups == {}
+
+
+def test_titled_short_form_joins_the_same_title():
+    groups = cluster({"Mr. Darcy": ["0.1"], "Mr. Fitzwilliam Darcy": ["0.1"]})
+    assert group_of(groups, "Mr. Darcy") == ["Mr. Darcy", "Mr. Fitzwilliam Darcy"]
+
+
+def test_near_identical_spellings_share_a_token():
+    groups = cluster({"Elizabeth": ["0.1"], "Elisabeth": ["2.0"]})
+    assert group_of(groups, "Elizabeth") == ["Elisabeth", "Elizabeth"]
+
+
+def test_unknown_is_never_grouped():
+    groups = cluster({"Unknown": ["0.1"], "unknown": ["0.2"]}, include_singletons=True)
+    assert groups == {}
@@ -0,0 +1,39 @@
+from alias_store import AliasStore
+from all_speakers import SpeakerRegistry
+
+
+def registry(*names):
+    speakers = SpeakerRegistry()
+    for i, name in enumerate(names):
+        speakers.add([name], f"0.{i}")
+    return speakers
+
+
+def test_exact_names_are_applied_and_variants_only_suggested():
+    store = AliasStore({"Mr. Darcy": ["Mr. Darcy", "Darcy"]})
+    speakers = ["Mr. Darcy", "Mr Darcy", "Elizabeth"]
+
+    assert store.apply(speakers) == {"Mr. Darcy": ["Mr. Darcy"]}
+    assert store.uncovered(speakers) == ["Mr Darcy", "Elizabeth"]
+    assert store.suggest(speakers) == {"Mr. Darcy": ["Mr Darcy"]}
+
+
+def test_stored_title_does_not_capture_other_gender():
+    store = AliasStore({"Mr. Bennet": ["Mr. Bennet"]})
+
+    assert store.suggested_group("Mrs. Bennet") is None
+    mapping = store.resolve(registry("Mr. Bennet", "Mrs. Bennet"), headless=True)
+    assert mapping["Mr. Bennet"] == ["Mr. Bennet"]
+    assert mapping["Mrs. Bennet"] == ["Mrs. Bennet"]
+
+
+def test_new_group_named_like_stored_group_is_kept():
+    # the stored group "Lizzy" does not list the name "Lizzy" itself
+    store = AliasStore({"Lizzy": ["Elizabeth"]})
+
+    mapping = store.resolve(registry("Elizabeth", "Lizzy"), headless=True)
+
+    assert mapping["Lizzy"] == ["Elizabeth"]
+    assert mapping["Lizzy (2)"] == ["Lizzy"]
+    mapped = sorted(alias for aliases in mapping.values() for alias in aliases)
+    assert mapped == ["Elizabeth", "Lizzy"]
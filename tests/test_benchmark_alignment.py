@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+import benchmark
+from benchmark import GAP, _align, _hirschberg, _pair_score
+
+WORDS = ["a b", "a b c", "d", "e f", "x y z", "q"]
+
+
+def brute_force_score(a, b):
+    """Best Needleman-Wunsch score with the full matrix."""
+    score = [[(i + j) * GAP if i == 0 or j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            score[i][j] = max(
+                score[i - 1][j - 1] + _pair_score(a[i - 1], b[j - 1]),
+                score[i - 1][j] + GAP,
+                score[i][j - 1] + GAP,
+            )
+    return score[len(a)][len(b)]
+
+
+def alignment_score(a, b, pairs):
+    return sum(GAP if i is None or j is None else _pair_score(a[i], b[j]) for i, j in pairs)
+
+
+def assert_valid(a, b, pairs):
+    """Every index appears exactly once and both sides are in order."""
+    gt = [i for i, _ in pairs if i is not None]
+    test = [j for _, j in pairs if j is not None]
+    assert gt == list(range(len(a)))
+    assert test == list(range(len(b)))
+
+
+def edited_pair(rng):
+    """Two order-preserving edits (deletions, changed texts) of the same distinct lines."""
+    base = [f"line {k}" for k in range(rng.randint(0, 12))]
+    a = [text for text in base if rng.random() > 0.25]
+    b = [text if rng.random() > 0.2 else text + " extra" for text in base if rng.random() > 0.25]
+    return a, b
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hirschberg_is_optimal(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        a = [rng.choice(WORDS) for _ in range(rng.randint(0, 7))]
+        b = [rng.choice(WORDS) for _ in range(rng.randint(0, 7))]
+        pairs = _hirschberg(a, b)
+        assert_valid(a, b, pairs)
+        assert alignment_score(a, b, pairs) == brute_force_score(a, b)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_align_is_optimal_for_edited_lines(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        a, b = edited_pair(rng)
+        pairs = _align(a, b)
+        assert_valid(a, b, pairs)
+        assert alignment_score(a, b, pairs) == brute_force_score(a, b)
+
+
+def test_align_is_valid_with_repeated_texts():
+    # anchors are a heuristic here, the result must still be a proper alignment
+    rng = random.Random(7)
+    for _ in range(300):
+        a = [rng.choice(WORDS) for _ in range(rng.randint(0, 9))]
+        b = [rng.choice(WORDS) for _ in range(rng.randint(0, 9))]
+        assert_valid(a, b, _align(a, b))
+
+
+def test_large_gaps_are_split_and_stay_valid(monkeypatch):
+    monkeypatch.setattr(benchmark, "MAX_CELLS", 4)
+    rng = random.Random(3)
+    for _ in range(100):
+        a, b = edited_pair(rng)
+        assert_valid(a, b, _align(a, b))
+
+
+def test_single_insertion_only_costs_itself():
+    gt = [f"line {k}" for k in range(6)]
+    test = gt[:3] + ["inserted"] + gt[3:]
+    assert _align(gt, test) == [(0, 0), (1, 1), (2, 2), (None, 3), (3, 4), (4, 5), (5, 6)]
@@ -0,0 +1,78 @@
+from chunk_store import ChunkStore
+from item_chunk import Chunk
+
+
+def chunk(index, text=None):
+    return Chunk(index, text if text is not None else f"<p>Content of {index} – ünïcödé</p>")
+
+
+def test_out_of_order_put_is_read_back_in_index_order(tmp_path):
+    indexes = ["0.0", "0.1", "1.0", "1.1", "2.0"]
+    with ChunkStore(str(tmp_path / "book.chunks"), truncate=True) as store:
+        processed = store.chunks("processed")
+        for index in ["1.1", "0.0", "2.0", "1.0", "0.1"]:
+            processed.put(chunk(index))
+        # put() alone does not add to the list
+        assert len(processed) == 0
+
+        for index in indexes:
+            processed.append_index(index)
+
+        assert len(processed) == len(indexes)
+        assert [c.get_index() for c in processed] == indexes
+        assert [c.get_content() for c in processed] == [chunk(i).get_content() for i in indexes]
+        assert processed[3].get_content() == chunk("1.1").get_content()
+
+
+def test_kinds_are_kept_apart_and_rewrites_win(tmp_path):
+    with ChunkStore(str(tmp_path / "book.chunks"), truncate=True) as store:
+        raw, processed = store.chunks("raw"), store.chunks("processed")
+        raw.extend([chunk("0.0", "raw a"), chunk("0.1", "raw b")])
+        processed.append(chunk("0.0", "first"))
+        store.put("processed", chunk("0.0", "second"))
+
+        assert [c.get_content() for c in raw] == ["raw a", "raw b"]
+        assert store.get("processed", "0.0").get_content() == "second"
+        assert store.indexes("processed") == ["0.0"]
+
+
+def test_reopening_rebuilds_the_index(tmp_path):
+    path = str(tmp_path / "book.chunks")
+    store = ChunkStore(path, truncate=True)
+    store.chunks("raw").extend([chunk("0.0"), chunk("0.1"), chunk("1.0")])
+    store.put("raw", chunk("0.1", "rewritten"))
+    store.close()
+
+    reopened = ChunkStore(path)
+    raw = reopened.chunks("raw")
+    assert [c.get_index() for c in raw] == ["0.0", "0.1", "1.0"]
+    assert raw[1].get_content() == "rewritten"
+
+    # appending after reopening keeps the existing records
+    raw.append(chunk("2.0"))
+    reopened.close()
+    with ChunkStore(path) as again:
+        assert again.indexes("raw") == ["0.0", "0.1", "1.0", "2.0"]
+
+
+def test_truncated_last_record_is_dropped(tmp_path):
+    path = str(tmp_path / "book.chunks")
+    with ChunkStore(path, truncate=True) as store:
+        store.chunks("raw").extend([chunk("0.0"), chunk("0.1")])
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 5)
+
+    with ChunkStore(path) as reopened:
+        assert reopened.indexes("raw") == ["0.0"]
+        assert reopened.get("raw", "0.0").get_content() == chunk("0.0").get_content()
+        reopened.put("raw", chunk("0.1"))
+    with ChunkStore(path) as again:
+        assert again.get("raw", "0.1").get_content() == chunk("0.1").get_content()
+
+
+def test_close_with_remove_deletes_the_file(tmp_path):
+    path = tmp_path / "book.chunks"
+    store = ChunkStore(str(path), truncate=True)
+    store.put("raw", chunk("0.0"))
+    store.close(remove=True)
+    assert not path.exists()
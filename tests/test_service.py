@@ -0,0 +1,113 @@
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from perf_benchmark import SyntheticEpub
+from service import JobService, make_handler
+
+
+@pytest.fixture
+def epub_bytes(tmp_path):
+    path = tmp_path / "book.epub"
+    SyntheticEpub(seed=1).write(str(path), items=2, paragraphs=8, density=0.5)
+    return path.read_bytes()
+
+
+@pytest.fixture
+def server(tmp_path):
+    service = JobService(str(tmp_path / "data"), provider="offline", poll_interval=0.05)
+    service.start()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    service.stop()
+
+
+def request(url, data=None, headers=None):
+    req = urllib.request.Request(url, data=data, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as err:
+        return err.code, err.headers, err.read()
+
+
+def wait_for(base_url, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        _, _, body = request(f"{base_url}/jobs/{job_id}")
+        job = json.loads(body)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_to_result_with_offline_client(server, epub_bytes):
+    _, base_url = server
+    status, _, body = request(f"{base_url}/jobs?filename=book.epub", data=epub_bytes)
+    assert status == 202
+    job_id = json.loads(body)["id"]
+
+    job = wait_for(base_url, job_id)
+    assert job["status"] == "done", job["error"]
+    assert job["chunks_done"] == job["chunks_total"] > 0
+
+    status, headers, result = request(f"{base_url}/jobs/{job_id}/result")
+    assert status == 200
+    assert headers["Content-Type"] == "application/epub+zip"
+    with zipfile.ZipFile(io.BytesIO(result)) as book:
+        chapters = [book.read(name) for name in book.namelist() if name.endswith("chapter_0.xhtml")]
+    assert chapters and b"speaker=" in chapters[0]
+
+
+def test_filename_cannot_inject_headers(server, epub_bytes):
+    service, base_url = server
+    job_id = service.submit('evil"\r\nX-Injected: 1.epub', epub_bytes)
+    assert service.jobs.get(job_id)["filename"] == "evil___X-Injected_ 1.epub"
+
+    job = wait_for(base_url, job_id)
+    assert job["status"] == "done", job["error"]
+    _, headers, _ = request(f"{base_url}/jobs/{job_id}/result")
+    assert "X-Injected" not in headers
+
+
+def test_invalid_content_length_is_rejected(server):
+    _, base_url = server
+    status, _, _ = request(f"{base_url}/jobs", data=b"x", headers={"Content-Length": "abc"})
+    assert status == 400
+
+
+def test_running_jobs_are_queued_again_after_restart(tmp_path, epub_bytes):
+    data_dir = tmp_path / "data"
+    service = JobService(str(data_dir), provider="offline")
+    job_id = service.submit("book.epub", epub_bytes)
+    assert service.jobs.claim()["id"] == job_id
+    service.jobs.update(job_id, chunks_done=3)
+    assert service.jobs.get(job_id)["status"] == "running"
+    service.jobs.db.close()
+
+    # a new service on the same data dir, as after a crash
+    restarted = JobService(str(data_dir), provider="offline", poll_interval=0.05)
+    job = restarted.jobs.get(job_id)
+    assert job["status"] == "queued"
+    assert job["chunks_done"] == 0
+
+    restarted.start()
+    try:
+        deadline = time.time() + 60
+        while restarted.jobs.get(job_id)["status"] not in ("done", "failed") and time.time() < deadline:
+            time.sleep(0.1)
+    finally:
+        restarted.stop()
+    assert restarted.jobs.get(job_id)["status"] == "done"
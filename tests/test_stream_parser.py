@@ -0,0 +1,72 @@
+import json
+import random
+
+import pytest
+
+from stream_parser import IncrementalSpeakerParser
+
+ANSWER = {
+    "speech": {"1": "John", "2": "Mrs. O'Brien", "3": "Zoë \"Z\" Müller", "4": "Back\\slash"},
+    "thought": {"1": "Sarah", "2": "Line\nBreak"},
+    "notes": {"1": "not a speaker"},
+}
+
+
+def expected_events(answer):
+    return [
+        (category, index, name)
+        for category in IncrementalSpeakerParser.CATEGORIES
+        for index, name in answer.get(category, {}).items()
+    ]
+
+
+def feed_all(pieces):
+    parser = IncrementalSpeakerParser()
+    events = []
+    for piece in pieces:
+        events.extend(parser.feed(piece))
+    return parser, events
+
+
+def random_split(text, rng):
+    cuts = sorted(rng.sample(range(1, len(text)), k=min(len(text) - 1, rng.randint(1, 20))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+def test_single_characters_give_the_same_events_as_one_piece(ensure_ascii):
+    text = "```json\n" + json.dumps(ANSWER, indent=2, ensure_ascii=ensure_ascii) + "\n```"
+
+    whole_parser, whole = feed_all([text])
+    char_parser, by_char = feed_all(list(text))
+
+    assert whole == by_char == expected_events(ANSWER)
+    assert whole_parser.finished and char_parser.finished
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_splits_give_the_same_events(seed):
+    rng = random.Random(seed)
+    text = json.dumps(ANSWER, ensure_ascii=bool(seed % 2))
+
+    parser, events = feed_all(random_split(text, rng))
+
+    assert events == expected_events(ANSWER)
+    assert parser.finished
+
+
+def test_scalars_and_text_after_the_object():
+    text = '{"speech": {"1": null, "2": 7}, "thought": {}} trailing {"speech": {"9": "X"}}'
+
+    parser, events = feed_all(list(text))
+
+    assert events == [("speech", "1", ""), ("speech", "2", "7")]
+    assert parser.finished
+
+
+def test_incomplete_answer_is_not_finished():
+    text = json.dumps(ANSWER)
+    parser, events = feed_all([text[: len(text) // 2]])
+
+    assert not parser.finished
+    assert events == expected_events(ANSWER)[: len(events)]